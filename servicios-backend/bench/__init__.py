@@ -0,0 +1,7 @@
+"""Benchmarks de carga reproducibles: datos sintéticos, escenarios por endpoint y comparación contra baselines.
+
+Uso, desde servicios-backend:
+
+    python -m bench generate --scale small --db /tmp/bench.db
+    python -m bench run --db /tmp/bench.db --mode client --baseline bench/baselines/small-client.json
+"""
@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+import click
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench.datagen import SCALES, generate  # noqa: E402
+from bench.runner import (GunicornServer, HTTPTransport, TestClientTransport, compare, format_table,  # noqa: E402
+                          metadata, peak_rss_mb, run_scenario)
+from bench.scenarios import SCENARIOS, uncovered_endpoints  # noqa: E402
+
+# Configuración común: sin logs de consultas lentas ni presupuestos que ensucien la medición
+BENCH_CONFIG = {'SLOW_QUERY_MS': 0, 'ENFORCE_QUERY_BUDGETS': False}
+
+
+def _make_app(db_path, cache=False, **config):
+    from src.main import create_app
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(db_path)}',
+        'RESPONSE_CACHE_URL': 'memory://' if cache else 'none',
+        **BENCH_CONFIG,
+        **config,
+    })
+
+
+@click.group()
+def main():
+    """Benchmarks de la API sobre datos sintéticos"""
+
+
+@main.command('generate')
+@click.option('--scale', type=click.Choice(list(SCALES)), default='small', show_default=True)
+@click.option('--db', 'db_path', required=True, help='Archivo SQLite a crear')
+@click.option('--seed', default=42, show_default=True)
+@click.option('--force', is_flag=True, help='Reemplaza el archivo si ya existe')
+def generate_command(scale, db_path, seed, force):
+    """Crea una base SQLite con el esquema actual y datos sintéticos"""
+    if os.path.exists(db_path):
+        if not force:
+            raise click.ClickException(f'{db_path} already exists (use --force)')
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+    from src.models.user import db
+    from src.utils import migrations
+    app = _make_app(db_path, PASSWORD_HASH_WORKERS=0)
+    with app.app_context():
+        migrations.upgrade(db.engine)
+        generate(scale, seed, echo=click.echo)
+
+
+def _working_copy(db_path, directory):
+    """Copia de la base para que cada corrida empiece del mismo estado"""
+    connection = sqlite3.connect(db_path)
+    connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    connection.close()
+    target = os.path.join(directory, 'bench.db')
+    shutil.copyfile(db_path, target)
+    return target
+
+
+def _context(app):
+    from src.models.change_log import ChangeLog
+    from src.models.professional import Professional
+    from src.models.review import Review
+    from src.models.service_request import ServiceRequest
+    from src.models.user import User, db
+    with app.app_context():
+        counts = {name: db.session.query(db.func.max(model.id)).scalar() or 0 for name, model in (
+            ('professionals', Professional), ('reviews', Review),
+            ('service_requests', ServiceRequest), ('users', User),
+        )}
+        changes = db.session.query(db.func.max(ChangeLog.id)).scalar() or 0
+        dumps = app.json.dumps
+    if not all(counts.values()):
+        raise click.ClickException('The database is empty: run "python -m bench generate" first')
+    return {**counts, 'changes': changes, 'now': datetime(2026, 1, 1), 'dumps': dumps}
+
+
+@main.command('run')
+@click.option('--db', 'db_path', required=True, help='Base generada con "generate" (no se modifica)')
+@click.option('--mode', type=click.Choice(['client', 'server', 'asgi']), default='client', show_default=True,
+              help='client: test client de Flask en el proceso; server: gunicorn real por HTTP; '
+                   'asgi: gunicorn con workers de uvicorn sirviendo src.asgi:app (pip install uvicorn aiosqlite)')
+@click.option('--iterations', default=200, show_default=True, help='Requests por escenario')
+@click.option('--concurrency', default=8, show_default=True, help='Clientes simultáneos (server y asgi)')
+@click.option('--workers', default=2, show_default=True, help='Workers de gunicorn (server y asgi)')
+@click.option('--only', multiple=True, help='Escenarios a correr (por defecto, todos)')
+@click.option('--cache', is_flag=True, help='Activa la caché de respuestas en memoria')
+@click.option('--trace-memory', is_flag=True, help='Pico de memoria Python por escenario (más lento; sólo client)')
+@click.option('--seed', default=1, show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False), help='Guarda los resultados en JSON')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), help='Resultados contra los que comparar')
+@click.option('--threshold', default=0.25, show_default=True, help='Regresión relativa tolerada (0.25 = 25%)')
+def run_command(db_path, mode, iterations, concurrency, workers, only, cache, trace_memory, seed,
+                output, baseline, threshold):
+    """Corre los escenarios y falla si hay regresiones respecto del baseline"""
+    scenarios = [s for s in SCENARIOS if not only or s.name in only]
+    unknown = set(only) - {s.name for s in SCENARIOS}
+    if unknown:
+        raise click.ClickException(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        working_db = _working_copy(db_path, directory)
+        app = _make_app(working_db, cache=cache)
+        missing = uncovered_endpoints(app)
+        if missing:
+            click.echo(f'warning: endpoints without a scenario: {", ".join(missing)}', err=True)
+        ctx = _context(app)
+        results = {'meta': metadata(mode, db=os.path.basename(db_path), iterations=iterations,
+                                    cache=cache, counts={k: ctx[k] for k in
+                                                         ('professionals', 'reviews', 'service_requests', 'users')}),
+                   'scenarios': {}}
+
+        if mode == 'client':
+            transport = TestClientTransport(app)
+            for scenario in scenarios:
+                results['scenarios'][scenario.name] = run_scenario(
+                    transport, scenario, iterations, 1, ctx, seed, trace_memory)
+            results['peak_rss_mb'] = peak_rss_mb()
+        else:
+            results['meta'].update(concurrency=concurrency, workers=workers)
+            env = {
+                'DATABASE_URI': f'sqlite:///{working_db}',
+                'RESPONSE_CACHE_URL': 'memory://' if cache else 'none',
+                'SLOW_QUERY_MS': '0',
+                'METRICS_DIR': os.path.join(directory, 'metrics'),
+                'EVENT_BROKER_URL': f"sqlite:///{os.path.join(directory, 'events.db')}",
+            }
+            with GunicornServer(env, workers=workers, asgi=mode == 'asgi') as server:
+                transport = HTTPTransport('127.0.0.1', server.port)
+                for scenario in scenarios:
+                    results['scenarios'][scenario.name] = run_scenario(
+                        transport, scenario, iterations, concurrency, ctx, seed)
+                results['peak_rss_mb'] = server.peak_rss_mb()
+                transport.close()
+
+    click.echo(format_table(results))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+    failed = [name for name, s in results['scenarios'].items() if s['errors']]
+    for name in failed:
+        s = results['scenarios'][name]
+        click.echo(f"{name}: {s['errors']} unexpected responses {s['error_statuses']}", err=True)
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), threshold)
+        for line in regressions:
+            click.echo(f'REGRESSION {line}', err=True)
+        if regressions:
+            raise click.ClickException(f'{len(regressions)} regressions over {threshold:.0%}')
+        click.echo(f'No regressions over {threshold:.0%} against {baseline}')
+    if failed:
+        raise click.ClickException(f'{len(failed)} scenarios returned unexpected statuses')
@@ -0,0 +1,157 @@
+"""Generador de datos sintéticos, determinista para una misma semilla"""
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+
+from src.models.professional import Professional
+from src.models.user import User, db
+from src.utils.bulk import RESOURCES
+from src.utils.passwords import get_hasher
+
+# (profesionales, reseñas, solicitudes de servicio, usuarios)
+SCALES = {
+    'tiny': (200, 2_000, 1_000, 50),
+    'small': (2_000, 20_000, 10_000, 200),
+    'medium': (20_000, 200_000, 100_000, 1_000),
+    'large': (100_000, 1_000_000, 500_000, 5_000),
+}
+BATCH_SIZE = 5_000
+BENCH_PASSWORD = 'bench-password'
+
+CATEGORIES = ('electricista', 'plomero', 'carpintero', 'pintor', 'mecanico', 'peluquero')
+SPECIALTIES = ('Instalaciones', 'Reparaciones', 'Mantenimiento', 'Emergencias', 'Muebles',
+               'Restauración', 'Domótica', 'Grifería', 'Interiores', 'Exteriores', 'Cortes', 'Color')
+FIRST_NAMES = ('Juan', 'María', 'Carlos', 'Ana', 'Luis', 'Laura', 'José', 'Sofía', 'Pedro', 'Lucía',
+               'Diego', 'Valentina', 'Jorge', 'Camila', 'Martín', 'Florencia')
+LAST_NAMES = ('Pérez', 'González', 'Rodríguez', 'Martínez', 'Fernández', 'López', 'Gómez', 'Díaz',
+              'Sánchez', 'Romero', 'Sosa', 'Álvarez', 'Torres', 'Ruiz')
+WORDS = ('trabajo', 'excelente', 'rápido', 'puntual', 'prolijo', 'recomendable', 'precio', 'calidad',
+         'atención', 'problema', 'resuelto', 'instalación', 'reparación', 'servicio', 'muy', 'bueno')
+# Santa Fe y alrededores
+CENTER = (-31.6333, -60.7)
+STATUS_WEIGHTS = (('pending', 3), ('accepted', 3), ('rejected', 1), ('completed', 5))
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def _avatar(name):
+    return ''.join(part[0] for part in name.split()[:2]).upper()
+
+
+def professional_data(rng):
+    name = _name(rng)
+    return {
+        'name': name,
+        'category': rng.choice(CATEGORIES),
+        'distance': f'{rng.uniform(0.1, 30):.1f} km',
+        'available': rng.random() < 0.8,
+        'specialties': rng.sample(SPECIALTIES, rng.randint(1, 4)),
+        'price': f'${rng.randrange(2_000, 20_000, 500):,}',
+        'avatar': _avatar(name),
+        'phone': f'+54 9 342 {rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+        'description': _text(rng, 12),
+        'latitude': CENTER[0] + rng.gauss(0, 0.15),
+        'longitude': CENTER[1] + rng.gauss(0, 0.15),
+    }
+
+
+def review_data(rng, professional_count, now):
+    name = _name(rng)
+    return {
+        'professional_id': rng.randint(1, professional_count),
+        'client_name': name,
+        'client_avatar': _avatar(name),
+        # sesgadas hacia arriba, como las reseñas reales
+        'rating': rng.choices((1, 2, 3, 4, 5), weights=(1, 1, 3, 8, 12))[0],
+        'comment': _text(rng, 10),
+        'created_at': (now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60))).isoformat(),
+    }
+
+
+def service_request_data(rng, professional_id, slot, start_day):
+    # Turnos de una hora consecutivos por profesional: nunca se pisan
+    day = start_day + timedelta(days=slot // 10)
+    name = _name(rng)
+    statuses, weights = zip(*STATUS_WEIGHTS)
+    return {
+        'client_name': name,
+        'client_phone': f'+54 9 342 {rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+        'professional_id': professional_id,
+        'service_date': day.isoformat(),
+        'service_time': f'{8 + slot % 10:02d}:00',
+        'address': f'Calle {rng.randint(1, 3000)}',
+        'description': _text(rng, 8),
+        'estimated_budget': f'${rng.randrange(1_000, 50_000, 500):,}',
+        'status': rng.choices(statuses, weights)[0],
+    }
+
+
+def _insert(resource, items):
+    _, build_row, insert_batch, _ = RESOURCES[resource]
+    batch = []
+    total = 0
+    for data in items:
+        row, extra = build_row(data)
+        batch.append((row, extra))
+        if len(batch) >= BATCH_SIZE:
+            insert_batch([r for r, _ in batch], [e for _, e in batch])
+            db.session.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        insert_batch([r for r, _ in batch], [e for _, e in batch])
+        db.session.commit()
+        total += len(batch)
+    return total
+
+
+def generate(scale, seed=42, echo=print):
+    """Llena la base (vacía y ya migrada) y devuelve {tabla: (filas, segundos)}"""
+    professionals, reviews, service_requests, users = SCALES[scale]
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    start_day = date(2026, 1, 1)
+    timings = {}
+
+    def timed(label, fn):
+        started = time.perf_counter()
+        count = fn()
+        timings[label] = (count, time.perf_counter() - started)
+        echo(f'{label}: {count} filas en {timings[label][1]:.1f}s')
+
+    timed('professionals', lambda: _insert('professionals', (professional_data(rng) for _ in range(professionals))))
+    timed('reviews', lambda: _insert('reviews', (review_data(rng, professionals, now) for _ in range(reviews))))
+    per_professional = max(1, service_requests // professionals)
+    timed('service_requests', lambda: _insert('service-requests', (
+        service_request_data(rng, professional_id, slot, start_day)
+        for professional_id in range(1, professionals + 1)
+        for slot in range(per_professional)
+    )))
+
+    def insert_users():
+        # Un solo hash para todos: el costo de scrypt no es lo que se mide aquí
+        password_hash = get_hasher().hash(BENCH_PASSWORD)
+        rows = [{'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': password_hash}
+                for i in range(1, users + 1)]
+        db.session.execute(insert(User), rows)
+        db.session.commit()
+        return len(rows)
+
+    timed('users', insert_users)
+
+    def rebuild_leaderboards():
+        # Las medias por categoría sólo se fijan al reconstruir, como en producción
+        count = Professional.rebuild_leaderboards()
+        db.session.commit()
+        return count
+
+    timed('leaderboards', rebuild_leaderboards)
+    return timings
@@ -0,0 +1,273 @@
+"""Ejecución de los escenarios, estadísticas y comparación contra un baseline"""
+import http.client
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from bench.scenarios import authorize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Diferencias menores a esto (en ms) se consideran ruido aunque superen el umbral relativo
+NOISE_FLOOR_MS = 0.5
+# Requests sin medir antes de cada escenario (cachés del motor, conexiones, imports diferidos)
+WARMUP_REQUESTS = 5
+
+
+class TestClientTransport:
+    """Requests en el mismo proceso con el test client de Flask (sin red ni servidor)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, req):
+        response = self.client.open(req.url, method=req.method, json=req.json, data=req.data,
+                                    headers=req.headers)
+        body = response.get_data()  # consume también las respuestas en streaming
+        response.close()
+        return response.status_code, _parse(response.mimetype, body)
+
+
+class HTTPTransport:
+    """Requests HTTP reales contra un servidor WSGI, una conexión por hilo"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self):
+        # Los workers gthread esperan a que se cierren las conexiones keep-alive antes de terminar
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    def request(self, req):
+        headers = dict(req.headers or {})
+        body = req.data
+        if req.json is not None:
+            body = json.dumps(req.json).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for attempt in (1, 2):
+            connection = self._connection()
+            try:
+                connection.request(req.method, urllib.parse.quote(req.url, safe='/?&=:%'), body=body,
+                                   headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # gunicorn cierra las conexiones keep-alive de los workers sync: se reconecta
+                connection.close()
+                self._local.connection = None
+                if attempt == 2:
+                    raise
+        mimetype = (response.getheader('Content-Type') or '').split(';')[0]
+        return response.status, _parse(mimetype, data)
+
+
+def _parse(mimetype, body):
+    if mimetype == 'application/json' and body:
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+    return None
+
+
+def percentile(sorted_values, p):
+    """Percentil por rango más cercano de una lista ordenada"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(transport, scenario, iterations, concurrency, ctx, seed, trace_memory=False):
+    """Corre un escenario y devuelve sus estadísticas (latencias en ms)"""
+    iterations = max(1, int(iterations * scenario.weight))
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(worker_index, count, measure=True):
+        rng = random.Random(f'{seed}:{scenario.name}:{worker_index}')
+        for _ in range(count):
+            prepared = scenario.prepare(transport, rng, ctx) if scenario.prepare else None
+            req = authorize(transport, ctx, scenario.make(rng, ctx, prepared))
+            started = time.perf_counter()
+            status, _ = transport.request(req)
+            elapsed = (time.perf_counter() - started) * 1000
+            if not measure:
+                continue
+            with lock:
+                latencies.append(elapsed)
+                if status not in scenario.ok:
+                    errors.append(status)
+
+    worker('warmup', min(WARMUP_REQUESTS, iterations), measure=False)
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    if concurrency <= 1:
+        worker(0, iterations)
+    else:
+        shares = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(worker, i, n) for i, n in enumerate(shares) if n]:
+                future.result()
+    wall = time.perf_counter() - started
+    peak_alloc = None
+    if trace_memory:
+        peak_alloc = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_statuses': sorted(set(errors)),
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else None,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'peak_alloc_mb': round(peak_alloc, 2) if peak_alloc is not None else None,
+    }
+
+
+def peak_rss_mb(pids=None):
+    """Memoria residente máxima (VmHWM) sumada de los procesos dados, o la de este proceso"""
+    if pids is None:
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return round(total / 1024, 1) if total else None
+
+
+def _process_tree(pid):
+    pids = [pid]
+    for current in pids:
+        try:
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class GunicornServer:
+    """Levanta gunicorn (con gunicorn.conf.py) contra la base del benchmark.
+
+    Por defecto sirve `src.main:app` con workers gthread; con asgi=True sirve
+    `src.asgi:app` con workers de uvicorn, para comparar ambos modos.
+    """
+
+    def __init__(self, env, workers=2, threads=1, asgi=False):
+        self.port = _free_port()
+        self.env = {**os.environ, **env}
+        self.workers = workers
+        self.threads = threads
+        self.asgi = asgi
+        self.process = None
+
+    def __enter__(self):
+        if self.asgi:
+            app = ['-k', 'uvicorn.workers.UvicornWorker', 'src.asgi:app']
+        else:
+            app = ['--threads', str(self.threads), 'src.main:app']
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-w', str(self.workers), '-b', f'127.0.0.1:{self.port}',
+             '--log-level', 'warning', *app],
+            cwd=BACKEND_DIR, env=self.env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError('gunicorn exited during startup')
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.2).close()
+                return self
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError('gunicorn did not start in 30s')
+
+    def peak_rss_mb(self):
+        return peak_rss_mb(_process_tree(self.process.pid))
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def compare(results, baseline, threshold):
+    """Regresiones respecto del baseline: p95 más lento o throughput menor que el umbral relativo"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        if (current['p95_ms'] > base['p95_ms'] * (1 + threshold)
+                and current['p95_ms'] - base['p95_ms'] > NOISE_FLOOR_MS):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+        if (base.get('throughput_rps') and current['throughput_rps']
+                and current['throughput_rps'] < base['throughput_rps'] * (1 - threshold)
+                and current['p50_ms'] - base['p50_ms'] > NOISE_FLOOR_MS):
+            regressions.append(
+                f"{name}: throughput {base['throughput_rps']:.1f} -> {current['throughput_rps']:.1f} req/s"
+            )
+    return regressions
+
+
+def format_table(results):
+    header = f"{'scenario':34} {'req':>5} {'err':>4} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8}"
+    lines = [header, '-' * len(header)]
+    for name, s in results['scenarios'].items():
+        lines.append(f"{name:34} {s['requests']:>5} {s['errors']:>4} {s['throughput_rps']:>9.1f} "
+                     f"{s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f}")
+    lines.append(f"peak RSS: {results['peak_rss_mb']} MB")
+    return '\n'.join(lines)
+
+
+def metadata(mode, **extra):
+    return {
+        'mode': mode,
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        **extra,
+    }
@@ -0,0 +1,256 @@
+"""Un escenario por endpoint de src/routes; cada uno arma un request con datos al azar"""
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+from bench.datagen import (BENCH_PASSWORD, CATEGORIES, SPECIALTIES, professional_data, review_data,
+                           service_request_data)
+from src.utils.pagination import encode_cursor
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    json: object = None
+    data: Optional[bytes] = None
+    headers: Optional[dict] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    endpoint: str                       # endpoint de Flask que ejercita (para verificar cobertura)
+    make: Callable                      # (rng, ctx, prepared) -> Request
+    prepare: Optional[Callable] = None  # (client, rng, ctx) -> datos para make; no se mide
+    ok: tuple = (200,)
+    # fracción de las iteraciones a correr: los listados sin filtro recorren tablas enteras
+    weight: float = 1.0
+
+
+def _professional_id(rng, ctx):
+    return rng.randint(1, ctx['professionals'])
+
+
+def _user_id(rng, ctx):
+    return rng.randint(1, ctx['users'])
+
+
+def _future_slot(rng):
+    # Fechas lejanas y al azar: los choques con turnos existentes son raros (y un 409 es válido)
+    day = date(2030, 1, 1) + timedelta(days=rng.randint(0, 3650))
+    return day.isoformat(), f'{rng.randint(8, 19):02d}:{rng.choice((0, 30)):02d}'
+
+
+def _ids(rng, count, n=20):
+    return ','.join(str(rng.randint(1, count)) for _ in range(n))
+
+
+def _batch_operations(rng, ctx, n=10):
+    # Mitad altas, mitad cambios de estado: una sola transacción por request
+    operations = [{'op': 'create', 'data': _new_service_request(rng, ctx)} for _ in range(n // 2)]
+    operations += [{'op': 'status', 'id': rng.randint(1, ctx['service_requests']),
+                    'status': rng.choice(('accepted', 'completed', 'rejected'))} for _ in range(n - n // 2)]
+    return operations
+
+
+def _changes_cursor(rng, ctx):
+    # Un cliente que quedó unas cientos de entradas atrás (el cursor es [último id, epoch])
+    last_id = max(0, ctx['changes'] - rng.randint(0, 500))
+    return encode_cursor([last_id, int(time.time())])
+
+
+def _new_service_request(rng, ctx):
+    data = service_request_data(rng, _professional_id(rng, ctx), 0, date(2030, 1, 1))
+    data['service_date'], data['service_time'] = _future_slot(rng)
+    data.pop('status')
+    return data
+
+
+def _create(client, url, body, key='id', ctx=None):
+    req = Request('POST', url, json=body)
+    if ctx is not None:
+        req = authorize(client, ctx, req)
+    status, payload = client.request(req)
+    return payload.get(key) if isinstance(payload, dict) else None
+
+
+def _create_professional(client, rng, ctx):
+    return _create(client, '/api/professionals', professional_data(rng), ctx=ctx)
+
+
+def _create_review(client, rng, ctx):
+    return _create(client, '/api/reviews', review_data(rng, ctx['professionals'], ctx['now']), ctx=ctx)
+
+
+def _create_service_request(client, rng, ctx):
+    return _create(client, '/api/service-requests', _new_service_request(rng, ctx), ctx=ctx)
+
+
+def _create_user(client, rng, ctx):
+    n = rng.getrandbits(48)
+    return _create(client, '/api/users', {'username': f'bench{n}', 'email': f'bench{n}@example.com'}, ctx=ctx)
+
+
+def _login(client, rng, ctx, n=None):
+    # user1 queda reservado para auth_me y las escrituras: un logout revoca todos los tokens del usuario
+    n = n or rng.randint(2, ctx['users'])
+    return _create(client, '/api/login', {'username': f'user{n}', 'password': BENCH_PASSWORD}, key='token')
+
+
+def _me_token(client, rng, ctx):
+    if 'token' not in ctx:
+        ctx['token'] = _login(client, rng, ctx, n=1)
+    return ctx['token']
+
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def authorize(client, ctx, req):
+    """Las escrituras exigen token: sin uno propio llevan el de user1"""
+    if req.method != 'GET' and 'Authorization' not in (req.headers or {}):
+        req.headers = {**(req.headers or {}), **_bearer(_me_token(client, None, ctx))}
+    return req
+
+
+def _ndjson_reviews(rng, ctx, count=100):
+    lines = (ctx['dumps'](review_data(rng, ctx['professionals'], ctx['now'])) for _ in range(count))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+SCENARIOS = [
+    # profesionales
+    Scenario('professionals_page', 'professional.get_professionals',
+             lambda rng, ctx, _: Request('GET', '/api/professionals?limit=50')),
+    Scenario('professionals_category_rating', 'professional.get_professionals',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals?category={rng.choice(CATEGORIES)}'
+                                                '&sort=rating&min_rating=4&limit=20')),
+    Scenario('professionals_specialty', 'professional.get_professionals',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals?specialty={rng.choice(SPECIALTIES)}&limit=20')),
+    Scenario('professionals_search', 'professional.search_professionals',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals/search?q={rng.choice(SPECIALTIES)}')),
+    Scenario('professionals_nearby', 'professional.get_nearby_professionals',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals/nearby?lat={-31.6 - rng.random() / 10:.4f}'
+                                                f'&lon={-60.7 + rng.random() / 10:.4f}&radius=5')),
+    Scenario('professional_detail', 'professional.get_professional',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals/{_professional_id(rng, ctx)}')),
+    Scenario('professionals_batch', 'professional.get_professionals_batch',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals/batch?ids={_ids(rng, ctx["professionals"])}')),
+    Scenario('professional_reviews', 'professional.get_professional_reviews',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals/{_professional_id(rng, ctx)}/reviews')),
+    Scenario('professional_availability', 'professional.get_professional_availability',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals/{_professional_id(rng, ctx)}/availability'
+                                                '?from=2026-01-01&to=2026-01-07')),
+    Scenario('professional_create', 'professional.create_professional',
+             lambda rng, ctx, _: Request('POST', '/api/professionals', json=professional_data(rng)), ok=(201,)),
+    Scenario('professional_update', 'professional.update_professional',
+             lambda rng, ctx, _: Request('PUT', f'/api/professionals/{_professional_id(rng, ctx)}',
+                                         json={'price': f'${rng.randrange(2_000, 20_000, 500):,}'})),
+    Scenario('professional_delete', 'professional.delete_professional',
+             lambda rng, ctx, pid: Request('DELETE', f'/api/professionals/{pid}'),
+             prepare=_create_professional, ok=(204,)),
+    Scenario('categories', 'professional.get_categories',
+             lambda rng, ctx, _: Request('GET', '/api/categories')),
+    Scenario('category_top', 'professional.get_category_top',
+             lambda rng, ctx, _: Request('GET', f'/api/categories/{rng.choice(CATEGORIES)}/top?limit=10')),
+    # reseñas
+    Scenario('reviews_all', 'review.get_reviews',
+             lambda rng, ctx, _: Request('GET', '/api/reviews'), weight=0.05),
+    Scenario('reviews_by_professional', 'review.get_reviews',
+             lambda rng, ctx, _: Request('GET', f'/api/reviews?professional_id={_professional_id(rng, ctx)}')),
+    Scenario('review_detail', 'review.get_review',
+             lambda rng, ctx, _: Request('GET', f'/api/reviews/{rng.randint(1, ctx["reviews"])}')),
+    Scenario('review_create', 'review.create_review',
+             lambda rng, ctx, _: Request('POST', '/api/reviews', json=review_data(rng, ctx['professionals'], ctx['now'])),
+             ok=(201,)),
+    Scenario('review_update', 'review.update_review',
+             lambda rng, ctx, _: Request('PUT', f'/api/reviews/{rng.randint(1, ctx["reviews"])}',
+                                         json={'rating': rng.randint(1, 5)})),
+    Scenario('review_delete', 'review.delete_review',
+             lambda rng, ctx, rid: Request('DELETE', f'/api/reviews/{rid}'),
+             prepare=_create_review, ok=(204,)),
+    # solicitudes de servicio
+    Scenario('service_requests_all', 'service_request.get_service_requests',
+             lambda rng, ctx, _: Request('GET', '/api/service-requests'), weight=0.05),
+    Scenario('service_requests_by_professional', 'service_request.get_service_requests',
+             lambda rng, ctx, _: Request('GET', f'/api/service-requests?professional_id={_professional_id(rng, ctx)}'
+                                                '&status=pending')),
+    Scenario('service_request_detail', 'service_request.get_service_request',
+             lambda rng, ctx, _: Request('GET', f'/api/service-requests/{rng.randint(1, ctx["service_requests"])}')),
+    Scenario('service_requests_batch', 'service_request.get_service_requests_batch',
+             lambda rng, ctx, _: Request('GET', f'/api/service-requests/batch?ids={_ids(rng, ctx["service_requests"])}')),
+    Scenario('service_request_create', 'service_request.create_service_request',
+             lambda rng, ctx, _: Request('POST', '/api/service-requests', json=_new_service_request(rng, ctx)),
+             ok=(201, 409)),
+    Scenario('service_request_update', 'service_request.update_service_request',
+             lambda rng, ctx, _: Request('PUT', f'/api/service-requests/{rng.randint(1, ctx["service_requests"])}',
+                                         json={'description': 'Actualizada'}), ok=(200, 409)),
+    Scenario('service_request_status', 'service_request.update_request_status',
+             lambda rng, ctx, _: Request('PUT', f'/api/service-requests/{rng.randint(1, ctx["service_requests"])}/status',
+                                         json={'status': rng.choice(('accepted', 'completed', 'rejected'))}),
+             ok=(200, 409)),
+    # un conflicto de agenda (409) o una solicitud ya borrada (404) anulan el lote entero
+    Scenario('service_requests_batch_write', 'service_request.batch_service_requests',
+             lambda rng, ctx, _: Request('POST', '/api/service-requests/batch',
+                                         json={'operations': _batch_operations(rng, ctx)}),
+             ok=(200, 404, 409)),
+    Scenario('service_request_delete', 'service_request.delete_service_request',
+             lambda rng, ctx, rid: Request('DELETE', f'/api/service-requests/{rid}'),
+             prepare=_create_service_request, ok=(204,)),
+    # streams SSE: ?timeout=0 reenvía lo publicado después de Last-Event-ID y cierra
+    Scenario('professional_stream_resume', 'service_request.stream_professional_requests',
+             lambda rng, ctx, _: Request('GET', f'/api/professionals/{_professional_id(rng, ctx)}'
+                                                '/service-requests/stream?timeout=0', headers={'Last-Event-ID': '0'})),
+    Scenario('service_request_stream_resume', 'service_request.stream_service_request',
+             lambda rng, ctx, _: Request('GET', f'/api/service-requests/{rng.randint(1, ctx["service_requests"])}'
+                                                '/stream?timeout=0', headers={'Last-Event-ID': '0'})),
+    # sincronización incremental
+    Scenario('changes_poll', 'changes.get_changes',
+             lambda rng, ctx, _: Request('GET', f'/api/changes?since={_changes_cursor(rng, ctx)}')),
+    # usuarios y autenticación
+    Scenario('users_all', 'user.get_users', lambda rng, ctx, _: Request('GET', '/api/users'), weight=0.2),
+    Scenario('user_detail', 'user.get_user',
+             lambda rng, ctx, _: Request('GET', f'/api/users/{_user_id(rng, ctx)}')),
+    Scenario('user_create', 'user.create_user',
+             lambda rng, ctx, _: Request('POST', '/api/users', json={
+                 'username': f'new{rng.getrandbits(48)}', 'email': f'new{rng.getrandbits(48)}@example.com'}),
+             ok=(201,)),
+    Scenario('user_update', 'user.update_user',
+             lambda rng, ctx, uid: Request('PUT', f'/api/users/{uid}', json={'email': f'upd{rng.getrandbits(48)}@example.com'}),
+             prepare=_create_user),
+    Scenario('user_delete', 'user.delete_user',
+             lambda rng, ctx, uid: Request('DELETE', f'/api/users/{uid}'), prepare=_create_user, ok=(204,)),
+    # register y login calculan un hash de contraseña: miden el pool de hashing, no la base
+    Scenario('auth_register', 'auth.register',
+             lambda rng, ctx, _: Request('POST', '/api/register', json={
+                 'username': f'reg{rng.getrandbits(48)}', 'email': f'reg{rng.getrandbits(48)}@example.com',
+                 'password': BENCH_PASSWORD}), ok=(201,), weight=0.2),
+    Scenario('auth_login', 'auth.login',
+             lambda rng, ctx, _: Request('POST', '/api/login', json={
+                 'username': f'user{_user_id(rng, ctx)}', 'password': BENCH_PASSWORD}), weight=0.2),
+    Scenario('auth_me', 'auth.me',
+             lambda rng, ctx, token: Request('GET', '/api/me', headers=_bearer(token)),
+             prepare=_me_token),
+    Scenario('auth_logout', 'auth.logout',
+             lambda rng, ctx, token: Request('POST', '/api/logout', headers=_bearer(token)),
+             # con varios clientes, otro logout del mismo usuario puede revocar el token antes
+             prepare=_login, ok=(204, 401), weight=0.2),
+    # carga masiva
+    Scenario('bulk_import_reviews', 'bulk.bulk_import',
+             lambda rng, ctx, _: Request('POST', '/api/bulk/reviews/import', data=_ndjson_reviews(rng, ctx),
+                                         headers={'Content-Type': 'application/x-ndjson'}), weight=0.2),
+    Scenario('bulk_export_professionals', 'bulk.bulk_export',
+             lambda rng, ctx, _: Request('GET', '/api/bulk/professionals/export'), weight=0.05),
+]
+
+
+def uncovered_endpoints(app):
+    """Endpoints de la API sin ningún escenario"""
+    covered = {scenario.endpoint for scenario in SCENARIOS}
+    return sorted(
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if rule.rule.startswith('/api/') and rule.endpoint not in covered
+    )
@@ -0,0 +1,35 @@
+# Configuración de gunicorn (se carga sola al arrancar desde servicios-backend).
+# La cantidad de workers se toma de WEB_CONCURRENCY, que Render define.
+import os
+import shutil
+import tempfile
+
+# Cada worker vuelca aquí sus métricas y /metrics las suma (ver utils/metrics.py)
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'servicios-metrics'))
+# Broker compartido de los streams SSE: un evento publicado en un worker llega a
+# los streams abiertos en todos (ver utils/event_stream.py). Se conserva entre
+# reinicios para que los clientes puedan reanudar con Last-Event-ID.
+os.environ.setdefault('EVENT_BROKER_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'servicios-events.db'))
+
+# Un stream SSE ocupa un hilo mientras está abierto, así que los workers
+# atienden con hilos (gthread) en vez de un request a la vez
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+
+# La app se importa una sola vez en el master y los workers la heredan al
+# hacer fork, así arrancan sin volver a importar nada. create_app() no abre
+# conexiones, pero por las dudas cada worker descarta las heredadas.
+preload_app = True
+
+
+def on_starting(server):
+    # Las métricas de una ejecución anterior no deben sumarse a las nuevas
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+
+
+def post_fork(server, worker):
+    from src.main import app
+    from src.models.user import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,7 @@
+"""Punto de entrada ASGI (modo async), alternativo a src.main:app.
+
+    gunicorn src.asgi:app -k uvicorn.workers.UvicornWorker
+"""
+from src.main import create_asgi_app
+
+app = create_asgi_app()
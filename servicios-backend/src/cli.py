@@ -0,0 +1,131 @@
+import logging
+
+import click
+
+from src.models.user import db
+from src.models.professional import Professional
+from src.sample_data import init_sample_data
+from src.utils import migrations
+from src.utils.bulk import RESOURCES as BULK_RESOURCES, export_ndjson, import_ndjson
+from src.utils.cache import invalidate
+from src.utils.changes import compact_change_log
+from src.utils.outbox import run_worker
+from src.utils.query_plans import find_full_scans
+from src.utils.search import rebuild_search_index
+from src.utils.static_assets import brotli, precompress_static
+
+
+def register_commands(app):
+    """Comandos `flask ...` de inicialización y mantenimiento"""
+
+    @app.cli.command('init-db')
+    @click.option('--sample-data', is_flag=True, help='Carga los profesionales y reseñas de ejemplo')
+    def init_db_command(sample_data):
+        """Aplica las migraciones y, opcionalmente, carga los datos de ejemplo.
+
+        Se ejecuta una vez por despliegue antes de arrancar gunicorn, para que
+        los workers no hagan DDL al iniciar.
+        """
+        applied = migrations.upgrade(db.engine)
+        click.echo('\n'.join(applied) if applied else 'El esquema ya está al día')
+        if sample_data:
+            init_sample_data()
+
+    @app.cli.command('rebuild-ratings')
+    def rebuild_ratings_command():
+        """Reconstruye los agregados de calificación desde la tabla review"""
+        updated = Professional.rebuild_rating_aggregates()
+        db.session.commit()
+        # Cambian el rating y el histograma de todos: listados, detalles y rankings
+        ids = db.session.scalars(db.select(Professional.id)).all()
+        invalidate('professionals', *[f'professional:{professional_id}' for professional_id in ids])
+        click.echo(f'Agregados reconstruidos para {updated} profesionales')
+
+    @app.cli.command('rebuild-leaderboards')
+    def rebuild_leaderboards_command():
+        """Recalcula la media de cada categoría y el puntaje de ranking de todos los profesionales"""
+        categories = Professional.rebuild_leaderboards()
+        db.session.commit()
+        invalidate('professionals')
+        click.echo(f'Rankings reconstruidos ({categories} categorías con reseñas)')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Recalcula el texto de búsqueda de cada profesional y regenera el índice"""
+        professionals = Professional.query.options(Professional.with_specialties()).all()
+        for professional in professionals:
+            professional.refresh_search_text()
+        db.session.flush()
+        rebuild_search_index(db.session.connection())
+        db.session.commit()
+        click.echo(f'Índice de búsqueda regenerado para {len(professionals)} profesionales')
+
+    @app.cli.command('import-ndjson')
+    @click.argument('resource', type=click.Choice(list(BULK_RESOURCES)))
+    @click.argument('source', type=click.File('rb'))
+    def import_ndjson_command(resource, source):
+        """Importa un archivo NDJSON (o - para stdin) en lotes"""
+        summary, tags = import_ndjson(resource, source)
+        invalidate(*tags)
+        for error in summary['errors']:
+            click.echo(f"línea {error['line']}: {error['error']}", err=True)
+        click.echo(f"{summary['inserted']} filas importadas, {summary['error_count']} errores")
+
+    @app.cli.command('export-ndjson')
+    @click.argument('resource', type=click.Choice(list(BULK_RESOURCES)))
+    @click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+    def export_ndjson_command(resource, target):
+        """Exporta todas las filas como NDJSON a un archivo (o a stdout)"""
+        for line in export_ndjson(resource):
+            target.write(line)
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade_command():
+        """Aplica las migraciones pendientes de src/migrations"""
+        applied = migrations.upgrade(db.engine)
+        click.echo('\n'.join(applied) if applied else 'El esquema ya está al día')
+
+    @app.cli.command('db-status')
+    def db_status_command():
+        """Lista las migraciones pendientes"""
+        pending = migrations.pending_migrations(db.engine)
+        click.echo('\n'.join(pending) if pending else 'El esquema ya está al día')
+
+    @app.cli.command('compress-static')
+    def compress_static_command():
+        """Genera las variantes .gz/.br del frontend compilado (ejecutar después de cada build)"""
+        written = precompress_static(app.static_folder)
+        for path in written:
+            click.echo(path)
+        if brotli is None:
+            click.echo('brotli no está instalado: sólo se generaron variantes .gz', err=True)
+        click.echo(f'{len(written)} archivos comprimidos')
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Falla si alguna consulta de las rutas recorre una tabla completa (sólo SQLite)"""
+        if db.engine.dialect.name != 'sqlite':
+            raise click.ClickException('EXPLAIN QUERY PLAN sólo está disponible con SQLite')
+        problems = find_full_scans(app, db)
+        for url, statement, detail in problems:
+            click.echo(f'{url}: {detail}' if statement is None else f'{url}: {detail}\n    {statement}', err=True)
+        if problems:
+            raise click.ClickException(f'{len(problems)} problemas en los planes de consulta')
+        click.echo('Todas las consultas usan índices')
+
+    @app.cli.command('compact-changes')
+    @click.option('--retention-days', type=int, help='Por defecto CHANGE_LOG_RETENTION_DAYS')
+    def compact_changes_command(retention_days):
+        """Compacta el change log: borra entradas vencidas y las reemplazadas por otra más nueva"""
+        retention_days = retention_days or app.config['CHANGE_LOG_RETENTION_DAYS']
+        expired, superseded = compact_change_log(retention_days)
+        click.echo(f'{expired} entradas vencidas y {superseded} reemplazadas eliminadas')
+
+    @app.cli.command('outbox-worker')
+    @click.option('--batch-size', default=100, show_default=True, help='Eventos por transacción')
+    @click.option('--interval', default=1.0, show_default=True, help='Segundos de espera cuando no hay eventos')
+    @click.option('--once', is_flag=True, help='Drena un solo lote y termina')
+    def outbox_worker_command(batch_size, interval, once):
+        """Entrega los eventos del outbox con los handlers de OUTBOX_HANDLERS"""
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+        run_worker(batch_size, interval, once)
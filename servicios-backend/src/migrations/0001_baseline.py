@@ -0,0 +1,60 @@
+"""Esquema original: user, professional, review y service_request"""
+import sqlalchemy as sa
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'user', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('username', sa.String(80), unique=True, nullable=False),
+    sa.Column('email', sa.String(120), unique=True, nullable=False),
+    sa.Column('password_hash', sa.String(128)),
+)
+
+sa.Table(
+    'professional', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('name', sa.String(100), nullable=False),
+    sa.Column('category', sa.String(50), nullable=False),
+    sa.Column('rating', sa.Float),
+    sa.Column('reviews_count', sa.Integer),
+    sa.Column('distance', sa.String(20), nullable=False),
+    sa.Column('available', sa.Boolean),
+    sa.Column('specialties', sa.Text),
+    sa.Column('price', sa.String(20), nullable=False),
+    sa.Column('avatar', sa.String(10), nullable=False),
+    sa.Column('phone', sa.String(20)),
+    sa.Column('description', sa.Text),
+    sa.Column('location', sa.String(100)),
+)
+
+sa.Table(
+    'review', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('professional_id', sa.Integer, sa.ForeignKey('professional.id'), nullable=False),
+    sa.Column('client_name', sa.String(100), nullable=False),
+    sa.Column('client_avatar', sa.String(10), nullable=False),
+    sa.Column('rating', sa.Integer, nullable=False),
+    sa.Column('comment', sa.Text, nullable=False),
+    sa.Column('created_at', sa.DateTime),
+)
+
+sa.Table(
+    'service_request', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('client_name', sa.String(100), nullable=False),
+    sa.Column('client_phone', sa.String(20), nullable=False),
+    sa.Column('professional_id', sa.Integer, sa.ForeignKey('professional.id'), nullable=False),
+    sa.Column('service_date', sa.Date, nullable=False),
+    sa.Column('service_time', sa.Time, nullable=False),
+    sa.Column('address', sa.String(200), nullable=False),
+    sa.Column('description', sa.Text, nullable=False),
+    sa.Column('estimated_budget', sa.String(20)),
+    sa.Column('status', sa.String(20)),
+    sa.Column('created_at', sa.DateTime),
+)
+
+
+def upgrade(connection):
+    # Las bases creadas antes con db.create_all() ya tienen estas tablas
+    metadata.create_all(connection, checkfirst=True)
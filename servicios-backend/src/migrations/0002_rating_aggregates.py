@@ -0,0 +1,25 @@
+"""Agregados incrementales de reseñas en professional"""
+import sqlalchemy as sa
+from src.utils.migrations import add_column
+
+
+def upgrade(connection):
+    for name in ('rating_sum', 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5'):
+        add_column(connection, 'professional',
+                   sa.Column(name, sa.Integer, nullable=False, server_default='0'))
+
+    # Recalcular desde la tabla review para que los agregados partan consistentes
+    connection.execute(sa.text("""
+        UPDATE professional SET
+            reviews_count = (SELECT COUNT(*) FROM review WHERE review.professional_id = professional.id),
+            rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM review WHERE review.professional_id = professional.id),
+            stars_1 = (SELECT COUNT(*) FROM review WHERE review.professional_id = professional.id AND rating = 1),
+            stars_2 = (SELECT COUNT(*) FROM review WHERE review.professional_id = professional.id AND rating = 2),
+            stars_3 = (SELECT COUNT(*) FROM review WHERE review.professional_id = professional.id AND rating = 3),
+            stars_4 = (SELECT COUNT(*) FROM review WHERE review.professional_id = professional.id AND rating = 4),
+            stars_5 = (SELECT COUNT(*) FROM review WHERE review.professional_id = professional.id AND rating = 5)
+    """))
+    connection.execute(sa.text("""
+        UPDATE professional SET rating = CASE WHEN reviews_count = 0 THEN 0.0
+            ELSE ROUND(rating_sum * 1.0 / reviews_count, 1) END
+    """))
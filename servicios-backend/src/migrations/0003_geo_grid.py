@@ -0,0 +1,12 @@
+"""Coordenadas y celda de grilla indexada para la búsqueda por cercanía"""
+import sqlalchemy as sa
+from src.utils.migrations import add_column, create_index
+
+
+def upgrade(connection):
+    add_column(connection, 'professional', sa.Column('latitude', sa.Float))
+    add_column(connection, 'professional', sa.Column('longitude', sa.Float))
+    add_column(connection, 'professional', sa.Column('geo_cell', sa.String(16)))
+
+    table = sa.Table('professional', sa.MetaData(), autoload_with=connection)
+    create_index(connection, sa.Index('ix_professional_geo_cell', table.c.geo_cell))
@@ -0,0 +1,36 @@
+"""Texto de búsqueda normalizado e índice de texto completo"""
+import json
+
+import sqlalchemy as sa
+from src.utils.migrations import add_column
+from src.utils.search import build_search_text, install_search_index, rebuild_search_index
+
+
+def _specialty_names(raw):
+    if not raw:
+        return []
+    try:
+        names = json.loads(raw)
+    except ValueError:
+        return [raw]
+    return [str(n) for n in names] if isinstance(names, list) else [str(names)]
+
+
+def upgrade(connection):
+    add_column(connection, 'professional', sa.Column('search_text', sa.Text))
+
+    rows = connection.execute(sa.text(
+        'SELECT id, name, category, specialties, description FROM professional'
+    )).all()
+    if rows:
+        connection.execute(
+            sa.text('UPDATE professional SET search_text = :search_text WHERE id = :id'),
+            [{'id': row.id,
+              'search_text': build_search_text(row.name, row.category,
+                                               ' '.join(_specialty_names(row.specialties)),
+                                               row.description)}
+             for row in rows]
+        )
+
+    install_search_index(connection)
+    rebuild_search_index(connection)
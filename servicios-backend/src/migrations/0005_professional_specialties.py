@@ -0,0 +1,49 @@
+"""Especialidades en una tabla asociativa indexada en lugar de JSON"""
+import json
+
+import sqlalchemy as sa
+from src.utils.migrations import drop_column, has_column
+from src.utils.search import normalize_text
+
+metadata = sa.MetaData()
+
+professional_specialty = sa.Table(
+    'professional_specialty', metadata,
+    sa.Column('professional_id', sa.Integer, sa.ForeignKey('professional.id', ondelete='CASCADE'),
+              primary_key=True),
+    sa.Column('slug', sa.String(50), primary_key=True),
+    sa.Column('name', sa.String(50), nullable=False),
+    sa.Column('position', sa.Integer, nullable=False),
+    sa.Index('ix_professional_specialty_slug', 'slug', 'professional_id'),
+)
+
+# professional sólo se declara para que la clave foránea se pueda resolver
+sa.Table('professional', metadata, sa.Column('id', sa.Integer, primary_key=True))
+
+
+def upgrade(connection):
+    professional_specialty.create(connection, checkfirst=True)
+
+    if not has_column(connection, 'professional', 'specialties'):
+        return
+    links = []
+    rows = connection.execute(sa.text(
+        'SELECT id, specialties FROM professional WHERE specialties IS NOT NULL'
+    ))
+    for professional_id, raw in rows:
+        try:
+            names = json.loads(raw)
+        except ValueError:
+            names = [raw]
+        if not isinstance(names, list):
+            names = [names]
+        seen = set()
+        for name in (str(n).strip() for n in names):
+            slug = normalize_text(name).strip()
+            if slug and slug not in seen:
+                seen.add(slug)
+                links.append({'professional_id': professional_id, 'slug': slug,
+                              'name': name, 'position': len(seen) - 1})
+    if links:
+        connection.execute(professional_specialty.insert(), links)
+    drop_column(connection, 'professional', 'specialties')
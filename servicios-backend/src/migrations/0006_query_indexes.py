@@ -0,0 +1,20 @@
+"""Índices compuestos según los accesos de las rutas"""
+import sqlalchemy as sa
+from src.utils.migrations import create_index
+
+
+def upgrade(connection):
+    metadata = sa.MetaData()
+    professional = sa.Table('professional', metadata, autoload_with=connection)
+    review = sa.Table('review', metadata, autoload_with=connection)
+    service_request = sa.Table('service_request', metadata, autoload_with=connection)
+
+    for index in (
+        sa.Index('ix_professional_category_rating', professional.c.category, professional.c.rating),
+        sa.Index('ix_professional_rating', professional.c.rating),
+        sa.Index('ix_review_professional_created', review.c.professional_id, review.c.created_at),
+        sa.Index('ix_review_created_at', review.c.created_at),
+        sa.Index('ix_service_request_professional_status',
+                 service_request.c.professional_id, service_request.c.status),
+    ):
+        create_index(connection, index)
@@ -0,0 +1,9 @@
+"""Versión de tokens por usuario para poder revocar sesiones"""
+import sqlalchemy as sa
+from src.utils.migrations import add_column
+
+
+def upgrade(connection):
+    # "user" es palabra reservada en PostgreSQL; add_column cita el nombre de la tabla
+    add_column(connection, 'user',
+               sa.Column('token_version', sa.Integer, nullable=False, server_default='0'))
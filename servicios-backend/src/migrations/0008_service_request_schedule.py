@@ -0,0 +1,31 @@
+"""Duración e intervalo [start_at, end_at) indexado de cada solicitud de servicio"""
+from datetime import datetime, timedelta
+import sqlalchemy as sa
+from src.utils.migrations import add_column, create_index
+
+
+def upgrade(connection):
+    add_column(connection, 'service_request',
+               sa.Column('duration_minutes', sa.Integer, nullable=False, server_default='60'))
+    add_column(connection, 'service_request', sa.Column('start_at', sa.DateTime))
+    add_column(connection, 'service_request', sa.Column('end_at', sa.DateTime))
+
+    table = sa.Table('service_request', sa.MetaData(), autoload_with=connection)
+    rows = connection.execute(
+        sa.select(table.c.id, table.c.service_date, table.c.service_time, table.c.duration_minutes)
+        .where(table.c.start_at.is_(None))
+    ).all()
+    if rows:
+        params = []
+        for row in rows:
+            start_at = datetime.combine(row.service_date, row.service_time)
+            params.append({'row_id': row.id, 'new_start': start_at,
+                           'new_end': start_at + timedelta(minutes=row.duration_minutes)})
+        connection.execute(
+            table.update().where(table.c.id == sa.bindparam('row_id'))
+            .values(start_at=sa.bindparam('new_start'), end_at=sa.bindparam('new_end')),
+            params
+        )
+
+    create_index(connection, sa.Index('ix_service_request_professional_start',
+                                      table.c.professional_id, table.c.start_at))
@@ -0,0 +1,23 @@
+"""Tabla outbox para entregar eventos de solicitudes de servicio fuera del request"""
+import sqlalchemy as sa
+
+outbox_event = sa.Table(
+    'outbox_event', sa.MetaData(),
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('idempotency_key', sa.String(64), nullable=False, unique=True),
+    sa.Column('event_type', sa.String(50), nullable=False),
+    sa.Column('aggregate_type', sa.String(50), nullable=False),
+    sa.Column('aggregate_id', sa.Integer, nullable=False),
+    sa.Column('payload', sa.Text, nullable=False),
+    sa.Column('status', sa.String(20), nullable=False),
+    sa.Column('attempts', sa.Integer, nullable=False),
+    sa.Column('last_error', sa.Text),
+    sa.Column('available_at', sa.DateTime, nullable=False),
+    sa.Column('created_at', sa.DateTime, nullable=False),
+    sa.Column('delivered_at', sa.DateTime),
+    sa.Index('ix_outbox_event_status_available', 'status', 'available_at', 'id'),
+)
+
+
+def upgrade(connection):
+    outbox_event.create(connection, checkfirst=True)
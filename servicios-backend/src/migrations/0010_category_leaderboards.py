@@ -0,0 +1,41 @@
+"""Ranking bayesiano por categoría: medias por categoría y puntaje materializado"""
+import sqlalchemy as sa
+from src.utils.migrations import add_column, create_index
+
+metadata = sa.MetaData()
+
+category_prior = sa.Table(
+    'category_prior', metadata,
+    sa.Column('category', sa.String(50), primary_key=True),
+    sa.Column('mean', sa.Float, nullable=False),
+    sa.Column('reviews_count', sa.Integer, nullable=False),
+    sa.Column('updated_at', sa.DateTime, nullable=False),
+)
+
+# Mismos valores que src.models.category
+PRIOR_WEIGHT = 10
+DEFAULT_PRIOR_MEAN = 3.5
+
+
+def upgrade(connection):
+    category_prior.create(connection, checkfirst=True)
+    add_column(connection, 'professional',
+               sa.Column('leaderboard_score', sa.Float, nullable=False, server_default='0'))
+
+    connection.execute(sa.text("""
+        INSERT INTO category_prior (category, mean, reviews_count, updated_at)
+        SELECT category, SUM(rating_sum) * 1.0 / SUM(reviews_count), SUM(reviews_count), CURRENT_TIMESTAMP
+        FROM professional GROUP BY category HAVING SUM(reviews_count) > 0
+    """))
+    connection.execute(sa.text("""
+        UPDATE professional SET leaderboard_score =
+            (:weight * COALESCE((SELECT mean FROM category_prior
+                                 WHERE category_prior.category = professional.category), :default_mean)
+             + rating_sum) / (:weight + reviews_count)
+    """), {'weight': PRIOR_WEIGHT, 'default_mean': DEFAULT_PRIOR_MEAN})
+
+    professional = sa.Table('professional', sa.MetaData(), autoload_with=connection)
+    create_index(connection, sa.Index(
+        'ix_professional_leaderboard', professional.c.category, professional.c.available,
+        professional.c.leaderboard_score.desc(), professional.c.id
+    ))
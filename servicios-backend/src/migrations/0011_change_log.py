@@ -0,0 +1,27 @@
+"""Versión de fila y change log para la sincronización incremental"""
+import sqlalchemy as sa
+from src.utils.migrations import add_column
+
+change_log = sa.Table(
+    'change_log', sa.MetaData(),
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('entity_type', sa.String(30), nullable=False),
+    sa.Column('entity_id', sa.Integer, nullable=False),
+    sa.Column('operation', sa.String(10), nullable=False),
+    sa.Column('changed_at', sa.DateTime, nullable=False),
+    sa.Index('ix_change_log_type_id', 'entity_type', 'id'),
+    sa.Index('ix_change_log_entity', 'entity_type', 'entity_id', 'id'),
+    sa.Index('ix_change_log_changed_at', 'changed_at'),
+)
+
+
+def upgrade(connection):
+    change_log.create(connection, checkfirst=True)
+    for table in ('professional', 'review', 'service_request'):
+        add_column(connection, table, sa.Column('version', sa.Integer, nullable=False, server_default='1'))
+        add_column(connection, table, sa.Column('updated_at', sa.DateTime))
+
+    # Las filas existentes no entran al log: los clientes parten de una descarga completa
+    connection.execute(sa.text('UPDATE review SET updated_at = created_at WHERE updated_at IS NULL'))
+    connection.execute(sa.text('UPDATE service_request SET updated_at = created_at WHERE updated_at IS NULL'))
+    connection.execute(sa.text('UPDATE professional SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL'))
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from src.models.user import db
+
+# Catálogo fijo de categorías (GET /api/categories)
+CATEGORIES = [
+    {'id': 'electricista', 'name': 'Electricista', 'icon': 'zap'},
+    {'id': 'plomero', 'name': 'Plomero', 'icon': 'droplets'},
+    {'id': 'carpintero', 'name': 'Carpintero', 'icon': 'hammer'},
+    {'id': 'pintor', 'name': 'Pintor', 'icon': 'paintbrush'},
+    {'id': 'mecanico', 'name': 'Mecánico', 'icon': 'wrench'},
+    {'id': 'peluquero', 'name': 'Peluquero', 'icon': 'scissors'}
+]
+CATEGORY_IDS = frozenset(c['id'] for c in CATEGORIES)
+
+# Peso del prior bayesiano: cuántas reseñas "promedio" de la categoría se suman a las propias
+PRIOR_WEIGHT = 10
+# Media del prior para categorías sin reseñas o sin reconstruir todavía
+DEFAULT_PRIOR_MEAN = 3.5
+
+
+class CategoryPrior(db.Model):
+    """Calificación media de cada categoría, usada como prior del ranking.
+
+    Se recalcula con `flask rebuild-leaderboards`. Entre reconstrucciones queda
+    fija, así una reseña sólo cambia el puntaje de su propio profesional.
+    """
+    __tablename__ = 'category_prior'
+
+    category = db.Column(db.String(50), primary_key=True)
+    mean = db.Column(db.Float, nullable=False)
+    reviews_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CategoryPrior {self.category} {self.mean:.2f}>'
+
+    @classmethod
+    def mean_for(cls, category):
+        """Subconsulta escalar con la media del prior (correlacionable con professional.category)"""
+        return func.coalesce(
+            db.select(cls.mean).where(cls.category == category).scalar_subquery(),
+            DEFAULT_PRIOR_MEAN
+        )
+
+    @classmethod
+    def bayesian_score(cls, rating_sum, reviews_count, category):
+        """(C·m + suma de estrellas) / (C + n).
+
+        Con pocas reseñas el puntaje queda cerca de la media m de la categoría y
+        se acerca al promedio propio a medida que se acumulan.
+        """
+        return (PRIOR_WEIGHT * cls.mean_for(category) + rating_sum) / (PRIOR_WEIGHT + reviews_count)
+
+    @classmethod
+    def means(cls):
+        """{categoría: media} de todas las categorías reconstruidas"""
+        return dict(db.session.query(cls.category, cls.mean).all())
@@ -0,0 +1,48 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert, literal
+from src.models.user import db
+from datetime import datetime
+
+class ChangeLog(db.Model):
+    """Una fila escrita (insert, update o delete) en la misma transacción que el cambio.
+
+    El id es la posición en el log: GET /api/changes devuelve las entradas
+    posteriores al cursor del cliente.
+    """
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        # Filtro por ?types= recorriendo el log en orden
+        db.Index('ix_change_log_type_id', 'entity_type', 'id'),
+        # Compactación: entradas reemplazadas por otra más nueva de la misma fila
+        db.Index('ix_change_log_entity', 'entity_type', 'entity_id', 'id'),
+        db.Index('ix_change_log_changed_at', 'changed_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(30), nullable=False)  # professionals, reviews, service_requests
+    entity_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # insert, update, delete
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ChangeLog {self.id} {self.operation} {self.entity_type}:{self.entity_id}>'
+
+    @classmethod
+    def record(cls, entity_type, ids, operation):
+        """Registra cambios hechos con sentencias Core, que no pasan por los eventos de la sesión"""
+        now = datetime.utcnow()
+        rows = [{'entity_type': entity_type, 'entity_id': entity_id, 'operation': operation, 'changed_at': now}
+                for entity_id in ids]
+        if rows:
+            db.session.execute(insert(cls.__table__), rows)
+
+    @classmethod
+    def record_select(cls, entity_type, id_select, operation):
+        """Como record, para todas las filas de un SELECT de ids (INSERT ... SELECT)"""
+        columns = id_select.selected_columns
+        source = id_select.with_only_columns(
+            literal(entity_type), columns[0], literal(operation), literal(datetime.utcnow())
+        )
+        db.session.execute(insert(cls.__table__).from_select(
+            ['entity_type', 'entity_id', 'operation', 'changed_at'], source
+        ))
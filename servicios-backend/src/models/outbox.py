@@ -0,0 +1,42 @@
+from flask_sqlalchemy import SQLAlchemy
+from src.models.user import db
+from datetime import datetime
+from flask import current_app
+import uuid
+
+class OutboxEvent(db.Model):
+    """Evento pendiente de entrega, escrito en la misma transacción que el cambio que lo origina"""
+    __tablename__ = 'outbox_event'
+    # El worker toma los eventos pendientes por (status, available_at) sin escanear
+    __table_args__ = (
+        db.Index('ix_outbox_event_status_available', 'status', 'available_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    idempotency_key = db.Column(db.String(64), nullable=False, unique=True, default=lambda: uuid.uuid4().hex)
+    event_type = db.Column(db.String(50), nullable=False)
+    aggregate_type = db.Column(db.String(50), nullable=False)
+    aggregate_id = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processing, delivered, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    # Próximo intento; en 'processing' es el vencimiento del lease del worker que lo tomó
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<OutboxEvent {self.id} {self.event_type}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'idempotency_key': self.idempotency_key,
+            'event_type': self.event_type,
+            'aggregate_type': self.aggregate_type,
+            'aggregate_id': self.aggregate_id,
+            'payload': current_app.json.loads(self.payload),
+            'attempts': self.attempts,
+            'created_at': self.created_at
+        }
@@ -1,46 +1,278 @@
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import bindparam, case, event, func, insert, literal_column, update
+from sqlalchemy.orm import selectinload
 from src.models.user import db
+from src.models.category import CategoryPrior
+from src.models.change_log import ChangeLog
+from src.models.specialty import ProfessionalSpecialty
+from src.utils.geo import grid_cell
+from src.utils.search import build_search_text
 
 class Professional(db.Model):
+    __table_args__ = (
+        db.Index('ix_professional_category_rating', 'category', 'rating'),
+        db.Index('ix_professional_rating', 'rating'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50), nullable=False)
     rating = db.Column(db.Float, default=0.0)
     reviews_count = db.Column(db.Integer, default=0)
+    # Agregados de reseñas mantenidos de forma incremental (ver apply_review_delta)
+    rating_sum = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    stars_1 = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    stars_2 = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    stars_3 = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    stars_4 = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    stars_5 = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Puntaje bayesiano del ranking por categoría (ver CategoryPrior), materializado
+    leaderboard_score = db.Column(db.Float, default=0.0, server_default='0', nullable=False)
     distance = db.Column(db.String(20), nullable=False)
     available = db.Column(db.Boolean, default=True)
-    specialties = db.Column(db.Text)  # JSON string of specialties
     price = db.Column(db.String(20), nullable=False)
     avatar = db.Column(db.String(10), nullable=False)
     phone = db.Column(db.String(20))
     description = db.Column(db.Text)
     location = db.Column(db.String(100), default='Santa Fe')
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    # Celda de la grilla geográfica, indexada para las búsquedas por cercanía
+    geo_cell = db.Column(db.String(16), index=True)
+    # Texto normalizado (sin acentos) que alimenta el índice de búsqueda
+    search_text = db.Column(db.Text)
+    # Versión de la fila: sube en cada UPDATE (ver src.utils.changes)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    specialty_links = db.relationship(
+        'ProfessionalSpecialty', order_by='ProfessionalSpecialty.position',
+        cascade='all, delete-orphan', lazy=True
+    )
 
     def __repr__(self):
         return f'<Professional {self.name}>'
 
-    def to_dict(self):
-        import json
-        specialties_list = []
-        if self.specialties:
-            try:
-                specialties_list = json.loads(self.specialties)
-            except:
-                specialties_list = [self.specialties]
-        
-        return {
-            'id': self.id,
-            'name': self.name,
-            'category': self.category,
-            'rating': self.rating,
-            'reviews_count': self.reviews_count,
-            'distance': self.distance,
-            'available': self.available,
-            'specialties': specialties_list,
-            'price': self.price,
-            'avatar': self.avatar,
-            'phone': self.phone,
-            'description': self.description,
-            'location': self.location
-        }
+    # Campos que se pueden pedir con ?fields= en los listados
+    SERIALIZABLE_FIELDS = (
+        'id', 'name', 'category', 'rating', 'reviews_count', 'distance', 'available',
+        'specialties', 'price', 'avatar', 'phone', 'description', 'location',
+        'rating_histogram', 'latitude', 'longitude', 'updated_at', 'version'
+    )
+
+    @classmethod
+    def field_columns(cls, field):
+        """Columnas que hay que cargar para serializar un campo"""
+        if field == 'rating_histogram':
+            return [getattr(cls, f'stars_{n}') for n in range(1, 6)]
+        if field == 'specialties':
+            return []
+        return [getattr(cls, field)]
+
+    @classmethod
+    def with_specialties(cls):
+        """Opción de carga que trae las especialidades de todo el listado en un solo SELECT"""
+        return selectinload(cls.specialty_links)
+
+    @classmethod
+    def specialty_filter(cls, name):
+        """Condición indexada: el profesional tiene la especialidad dada"""
+        slug = ProfessionalSpecialty.slugify(name)
+        return cls.id.in_(
+            db.select(ProfessionalSpecialty.professional_id).where(ProfessionalSpecialty.slug == slug)
+        )
+
+    @classmethod
+    def apply_review_delta(cls, professional_id, added=None, removed=None):
+        """Actualiza los agregados por una reseña creada, editada o eliminada.
+
+        `added` y `removed` son las estrellas de la reseña creada o eliminada
+        (ambas en una edición).
+        """
+        star_deltas = {}
+        if added:
+            star_deltas[added] = star_deltas.get(added, 0) + 1
+        if removed:
+            star_deltas[removed] = star_deltas.get(removed, 0) - 1
+        cls.apply_star_deltas({professional_id: star_deltas})
+
+    @classmethod
+    def apply_star_deltas(cls, star_deltas_by_professional):
+        """Aplica variaciones del histograma ({id: {estrellas: delta}}) con UPDATE atómicos.
+
+        Los incrementos se calculan en la base de datos, así que dos reseñas
+        concurrentes no se pisan entre sí. Varios profesionales se actualizan
+        con una sola sentencia ejecutada en modo executemany. Cada uno sube de
+        versión y queda en el change log.
+        """
+        c = cls.__table__.c
+        new_count = c.reviews_count + bindparam('count_delta')
+        new_sum = c.rating_sum + bindparam('sum_delta')
+        statement = update(cls.__table__).where(c.id == bindparam('professional_id')).values(
+            reviews_count=new_count,
+            rating_sum=new_sum,
+            rating=func.coalesce(
+                func.round(new_sum * literal_column('1.0') / func.nullif(new_count, 0), 1), 0.0
+            ),
+            leaderboard_score=CategoryPrior.bayesian_score(new_sum, new_count, c.category),
+            version=c.version + 1,
+            updated_at=datetime.utcnow(),
+            **{f'stars_{n}': c[f'stars_{n}'] + bindparam(f'delta_{n}') for n in range(1, 6)}
+        )
+        params = []
+        for professional_id, star_deltas in star_deltas_by_professional.items():
+            row = {
+                'professional_id': professional_id,
+                'count_delta': sum(star_deltas.values()),
+                'sum_delta': sum(stars * delta for stars, delta in star_deltas.items()),
+            }
+            row.update({f'delta_{n}': star_deltas.get(n, 0) for n in range(1, 6)})
+            params.append(row)
+        if params:
+            db.session.execute(statement, params)
+            ChangeLog.record('professionals', star_deltas_by_professional, 'update')
+
+    @classmethod
+    def rebuild_rating_aggregates(cls):
+        """Recalcula todos los agregados de reseñas a partir de la tabla review"""
+        from src.models.review import Review
+
+        stats = db.session.query(
+            Review.professional_id,
+            func.count(Review.id),
+            func.sum(Review.rating),
+            *[func.sum(case((Review.rating == n, 1), else_=0)) for n in range(1, 6)]
+        ).group_by(Review.professional_id).all()
+
+        zeros = {f'stars_{n}': 0 for n in range(1, 6)}
+        cls.query.update({'rating': 0.0, 'reviews_count': 0, 'rating_sum': 0, **zeros,
+                          'version': cls.version + 1, 'updated_at': datetime.utcnow()},
+                         synchronize_session=False)
+        ChangeLog.record_select('professionals', db.select(cls.id), 'update')
+        rows = []
+        for professional_id, count, total, *histogram in stats:
+            row = {'id': professional_id, 'reviews_count': count, 'rating_sum': total,
+                   'rating': round(total / count, 1)}
+            row.update({f'stars_{n}': histogram[n - 1] for n in range(1, 6)})
+            rows.append(row)
+        if rows:
+            db.session.execute(update(cls), rows)
+        cls.refresh_leaderboard_scores()
+        return len(rows)
+
+    @classmethod
+    def leaderboard(cls, category, limit):
+        """Profesionales disponibles de una categoría, de mayor a menor puntaje.
+
+        Lee las primeras `limit` entradas de ix_professional_leaderboard, sin ordenar
+        la categoría completa.
+        """
+        return cls.query.options(cls.with_specialties()).filter(
+            cls.category == category,
+            cls.available == True
+        ).order_by(cls.leaderboard_score.desc(), cls.id).limit(limit)
+
+    @classmethod
+    def refresh_leaderboard_scores(cls, ids=None):
+        """Recalcula el puntaje de los profesionales dados (o de todos) con un UPDATE"""
+        c = cls.__table__.c
+        statement = update(cls.__table__).values(
+            leaderboard_score=CategoryPrior.bayesian_score(c.rating_sum, c.reviews_count, c.category)
+        )
+        if ids is not None:
+            statement = statement.where(c.id.in_(ids))
+        db.session.execute(statement)
+
+    @classmethod
+    def rebuild_leaderboards(cls):
+        """Recalcula la media de cada categoría y el puntaje de todos los profesionales"""
+        stats = db.session.query(
+            cls.category, func.sum(cls.rating_sum), func.sum(cls.reviews_count)
+        ).group_by(cls.category).all()
+        now = datetime.utcnow()
+        db.session.query(CategoryPrior).delete(synchronize_session=False)
+        rows = [
+            {'category': category, 'mean': total / count, 'reviews_count': count, 'updated_at': now}
+            for category, total, count in stats if count
+        ]
+        if rows:
+            db.session.execute(insert(CategoryPrior), rows)
+        cls.refresh_leaderboard_scores()
+        return len(rows)
+
+    def set_coordinates(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+        if latitude is None or longitude is None:
+            self.geo_cell = None
+        else:
+            self.geo_cell = grid_cell(latitude, longitude)
+
+    def refresh_search_text(self):
+        self.search_text = build_search_text(
+            self.name, self.category, ' '.join(self.specialties), self.description
+        )
+
+    @property
+    def specialties(self):
+        return [link.name for link in self.specialty_links]
+
+    @staticmethod
+    def clean_specialties(names):
+        """Nombres de especialidades sin espacios ni vacíos; lanza ValueError si no es una lista de textos"""
+        if names is None:
+            return []
+        # Un texto suelto se recorrería letra por letra
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise ValueError('specialties must be a list of strings')
+        return [name.strip() for name in names if name.strip()]
+
+    def set_specialties(self, names):
+        """Reemplaza las especialidades conservando el orden y sin duplicados (ValueError como clean_specialties)"""
+        existing = {link.slug: link for link in self.specialty_links}
+        links = []
+        for name in self.clean_specialties(names):
+            slug = ProfessionalSpecialty.slugify(name)
+            if not slug or any(link.slug == slug for link in links):
+                continue
+            link = existing.get(slug) or ProfessionalSpecialty(slug=slug)
+            link.name = name
+            link.position = len(links)
+            links.append(link)
+        self.specialty_links = links
+
+    def to_dict(self, fields=None):
+        data = {}
+        for field in fields or self.SERIALIZABLE_FIELDS:
+            if field == 'rating_histogram':
+                data[field] = {str(n): getattr(self, f'stars_{n}') for n in range(1, 6)}
+            else:
+                data[field] = getattr(self, field)
+        return data
+
+
+@event.listens_for(Professional, 'before_insert')
+@event.listens_for(Professional, 'before_update')
+def _refresh_search_text(mapper, connection, target):
+    target.refresh_search_text()
+
+
+@event.listens_for(Professional, 'before_insert')
+def _initial_leaderboard_score(mapper, connection, target):
+    # Sin reseñas el puntaje es la media de la categoría; se resuelve en el mismo INSERT
+    target.leaderboard_score = CategoryPrior.mean_for(target.category)
+
+
+@event.listens_for(Professional, 'before_update')
+def _move_leaderboard_score(mapper, connection, target):
+    # Al cambiar de categoría cambia el prior: se recalcula en el mismo UPDATE
+    if db.inspect(target).attrs.category.history.has_changes():
+        c = Professional.__table__.c
+        target.leaderboard_score = CategoryPrior.bayesian_score(c.rating_sum, c.reviews_count, target.category)
+
 
+# Ranking por categoría: sólo disponibles, puntaje descendente y el id como desempate
+db.Index('ix_professional_leaderboard', Professional.category, Professional.available,
+         Professional.leaderboard_score.desc(), Professional.id)
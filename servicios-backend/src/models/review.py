@@ -3,6 +3,11 @@ from src.models.user import db
 from datetime import datetime
 
 class Review(db.Model):
+    __table_args__ = (
+        db.Index('ix_review_professional_created', 'professional_id', 'created_at'),
+        db.Index('ix_review_created_at', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     professional_id = db.Column(db.Integer, db.ForeignKey('professional.id'), nullable=False)
     client_name = db.Column(db.String(100), nullable=False)
@@ -10,6 +15,9 @@ class Review(db.Model):
     rating = db.Column(db.Integer, nullable=False)  # 1-5 stars
     comment = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Versión de la fila: sube en cada UPDATE (ver src.utils.changes)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship
     professional = db.relationship('Professional', backref=db.backref('reviews', lazy=True))
@@ -25,6 +33,8 @@ class Review(db.Model):
             'client_avatar': self.client_avatar,
             'rating': self.rating,
             'comment': self.comment,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'version': self.version
         }
 
@@ -1,23 +1,100 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import joinedload
 from src.models.user import db
-from datetime import datetime
+from datetime import datetime, timedelta
+
+DEFAULT_DURATION_MINUTES = 60
+MAX_DURATION_MINUTES = 8 * 60
+VALID_STATUSES = ('pending', 'accepted', 'rejected', 'completed')
+# Estados que ocupan la agenda del profesional
+BLOCKING_STATUSES = ('pending', 'accepted')
 
 class ServiceRequest(db.Model):
+    __table_args__ = (
+        db.Index('ix_service_request_professional_status', 'professional_id', 'status'),
+        # Índice de intervalos: como la duración está acotada, los turnos que se
+        # solapan con [a, b) tienen start_at en (a - duración máxima, b)
+        db.Index('ix_service_request_professional_start', 'professional_id', 'start_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     client_name = db.Column(db.String(100), nullable=False)
     client_phone = db.Column(db.String(20), nullable=False)
     professional_id = db.Column(db.Integer, db.ForeignKey('professional.id'), nullable=False)
     service_date = db.Column(db.Date, nullable=False)
     service_time = db.Column(db.Time, nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False, default=DEFAULT_DURATION_MINUTES,
+                                 server_default=str(DEFAULT_DURATION_MINUTES))
+    start_at = db.Column(db.DateTime)  # service_date + service_time
+    end_at = db.Column(db.DateTime)    # start_at + duration_minutes
     address = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     estimated_budget = db.Column(db.String(20))
     status = db.Column(db.String(20), default='pending')  # pending, accepted, rejected, completed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Versión de la fila: sube en cada UPDATE (ver src.utils.changes)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship
     professional = db.relationship('Professional', backref=db.backref('service_requests', lazy=True))
 
+    @classmethod
+    def with_professional(cls):
+        """Opción de carga que trae el nombre del profesional en el mismo SELECT.
+
+        to_dict usa professional.name; sin esta opción cada fila de un listado
+        dispara un SELECT adicional.
+        """
+        from src.models.professional import Professional
+        return joinedload(cls.professional).load_only(Professional.id, Professional.name)
+
+    @classmethod
+    def overlapping(cls, professional_id, start_at, end_at):
+        """Turnos que ocupan la agenda y se solapan con [start_at, end_at).
+
+        La condición sobre start_at permite recorrer sólo un rango del índice
+        (professional_id, start_at) en lugar de todas las solicitudes.
+        """
+        return cls.query.filter(
+            cls.professional_id == professional_id,
+            cls.start_at > start_at - timedelta(minutes=MAX_DURATION_MINUTES),
+            cls.start_at < end_at,
+            cls.end_at > start_at,
+            cls.status.in_(BLOCKING_STATUSES)
+        )
+
+    @staticmethod
+    def lock_schedule(professional_id):
+        """Bloquea la agenda del profesional hasta el commit para serializar sus reservas.
+
+        Es un UPDATE que no cambia nada: en PostgreSQL bloquea la fila y en
+        SQLite toma el lock de escritura de la base (SELECT ... FOR UPDATE no
+        bloquea nada en SQLite). Las consultas de conflictos que siguen ven
+        todas las reservas confirmadas antes.
+        """
+        from src.models.professional import Professional
+        table = Professional.__table__
+        db.session.execute(table.update().where(table.c.id == professional_id).values(id=table.c.id))
+
+    def set_schedule(self, service_date, service_time, duration_minutes):
+        if not 1 <= duration_minutes <= MAX_DURATION_MINUTES:
+            raise ValueError(f'duration_minutes must be between 1 and {MAX_DURATION_MINUTES}')
+        self.service_date = service_date
+        self.service_time = service_time
+        self.duration_minutes = duration_minutes
+        self.start_at = datetime.combine(service_date, service_time)
+        self.end_at = self.start_at + timedelta(minutes=duration_minutes)
+
+    def find_conflicts(self):
+        """Otras reservas activas del profesional que se pisan con esta"""
+        if self.status not in BLOCKING_STATUSES:
+            return []
+        query = self.overlapping(self.professional_id, self.start_at, self.end_at)
+        if self.id is not None:
+            query = query.filter(ServiceRequest.id != self.id)
+        return query.all()
+
     def __repr__(self):
         return f'<ServiceRequest {self.id}>'
 
@@ -28,12 +105,16 @@ class ServiceRequest(db.Model):
             'client_phone': self.client_phone,
             'professional_id': self.professional_id,
             'professional_name': self.professional.name if self.professional else None,
-            'service_date': self.service_date.isoformat() if self.service_date else None,
+            'service_date': self.service_date,
+            # La API expone la hora sin segundos (HH:MM), no en ISO 8601
             'service_time': self.service_time.strftime('%H:%M') if self.service_time else None,
+            'duration_minutes': self.duration_minutes,
             'address': self.address,
             'description': self.description,
             'estimated_budget': self.estimated_budget,
             'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'version': self.version
         }
 
@@ -0,0 +1,23 @@
+from flask_sqlalchemy import SQLAlchemy
+from src.models.user import db
+from src.utils.search import normalize_text
+
+class ProfessionalSpecialty(db.Model):
+    __tablename__ = 'professional_specialty'
+    # El índice (slug, professional_id) resuelve los filtros ?specialty= sin escanear
+    __table_args__ = (
+        db.Index('ix_professional_specialty_slug', 'slug', 'professional_id'),
+    )
+
+    professional_id = db.Column(db.Integer, db.ForeignKey('professional.id', ondelete='CASCADE'), primary_key=True)
+    slug = db.Column(db.String(50), primary_key=True)  # nombre normalizado, sin acentos
+    name = db.Column(db.String(50), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ProfessionalSpecialty {self.professional_id} {self.slug}>'
+
+    @staticmethod
+    def slugify(name):
+        return normalize_text(name).strip()
+
@@ -1,7 +1,7 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, g, jsonify, request
 from src.models.user import User, db
-from werkzeug.security import generate_password_hash, check_password_hash
-import secrets
+from src.utils.auth import forget_user, issue_token, login_required, revoke_user_tokens
+from src.utils.database import use_primary
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -16,7 +16,7 @@ def register():
     user.set_password(data['password'])
     db.session.add(user)
     db.session.commit()
-    token = secrets.token_hex(16)
+    token = issue_token(user)
     return jsonify({'token': token, 'user': user.to_dict()}), 201
 
 @auth_bp.route('/login', methods=['POST'])
@@ -26,6 +26,26 @@ def login():
         return jsonify({'error': 'Missing fields'}), 400
     user = User.query.filter_by(username=data['username']).first()
     if user and user.check_password(data['password']):
-        token = secrets.token_hex(16)
+        # Actualizar el hash si cambió el algoritmo o el costo configurado
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+        token = issue_token(user)
         return jsonify({'token': token, 'user': user.to_dict()})
     return jsonify({'error': 'Invalid credentials'}), 401
+
+@auth_bp.route('/me', methods=['GET'])
+@use_primary  # el usuario recién registrado puede no haber llegado a la réplica
+@login_required
+def me():
+    return jsonify(g.current_user)
+
+@auth_bp.route('/logout', methods=['POST'])
+@login_required
+def logout():
+    """Revoca todos los tokens del usuario (cierra todas sus sesiones)"""
+    user = User.query.get_or_404(g.current_user['id'])
+    revoke_user_tokens(user)
+    db.session.commit()
+    forget_user(user.id)
+    return '', 204
@@ -0,0 +1,31 @@
+import io
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from src.utils.bulk import RESOURCES, export_ndjson, import_ndjson
+from src.utils.cache import invalidate
+from src.utils.auth import login_required
+
+bulk_bp = Blueprint('bulk', __name__)
+
+@bulk_bp.route('/bulk/<resource>/import', methods=['POST'])
+@login_required
+def bulk_import(resource):
+    """Importar filas desde un cuerpo NDJSON (un objeto JSON por línea)"""
+    if resource not in RESOURCES:
+        return jsonify({'error': 'Unknown resource'}), 404
+    stream = request.stream
+    if isinstance(stream, io.RawIOBase):
+        # LimitedStream lee byte a byte al partir en líneas; el buffer evita ese costo.
+        # Los servidores que marcan wsgi.input_terminated (gunicorn) entregan su
+        # propio stream, que ya parte en líneas con buffer y no es un RawIOBase.
+        stream = io.BufferedReader(stream, 1 << 16)
+    summary, tags = import_ndjson(resource, stream)
+    invalidate(*tags)
+    return jsonify(summary)
+
+@bulk_bp.route('/bulk/<resource>/export', methods=['GET'])
+def bulk_export(resource):
+    """Exportar todas las filas como NDJSON en streaming"""
+    if resource not in RESOURCES:
+        return jsonify({'error': 'Unknown resource'}), 404
+    return Response(stream_with_context(export_ndjson(resource)), mimetype='application/x-ndjson')
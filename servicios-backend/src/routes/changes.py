@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify, request
+from src.utils.changes import (DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT, CHANGE_TYPES, CursorExpired,
+                               changes_since, parse_types)
+from src.utils.query_budget import query_budget
+
+changes_bp = Blueprint('changes', __name__)
+
+@changes_bp.route('/changes', methods=['GET'])
+@query_budget(2 + len(CHANGE_TYPES))
+def get_changes():
+    """Cambios (altas, ediciones y bajas) posteriores a un cursor, para sincronizar sin descargar listas.
+
+    Parámetros: since (cursor de la respuesta anterior; sin él se devuelve sólo
+    el cursor actual), types (professionals, reviews, service_requests; por
+    defecto todos) y limit. Un cursor vencido responde 410: hay que volver a
+    descargar los listados completos.
+    """
+    try:
+        types = parse_types(request.args.get('types'))
+        limit = max(1, min(int(request.args.get('limit', DEFAULT_CHANGES_LIMIT)), MAX_CHANGES_LIMIT))
+        return jsonify(changes_since(request.args.get('since'), types, limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except CursorExpired:
+        return jsonify({'error': 'Cursor expired, download the full lists again'}), 410
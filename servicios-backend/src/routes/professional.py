@@ -1,101 +1,363 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime
+from flask import Blueprint, jsonify, request, url_for
+from sqlalchemy.orm import load_only
+from src.models.category import CATEGORIES, CATEGORY_IDS
+from src.models.change_log import ChangeLog
 from src.models.professional import Professional, db
 from src.models.review import Review
+from src.models.service_request import DEFAULT_DURATION_MINUTES, MAX_DURATION_MINUTES, ServiceRequest
+from src.utils.batch import multi_get, parse_ids
+from src.utils.geo import cells_within, haversine_km, parse_coordinates
+from src.utils.pagination import keyset_page, parse_limit
+from src.utils.search import search_professional_ids
+from src.utils.scheduling import WORKDAY_END, WORKDAY_START, free_slots, parse_date_range
+from src.utils.query_budget import query_budget
+from src.utils.cache import cached, invalidate
+from src.utils.streaming import json_list_response
+from src.utils.auth import login_required
 
 professional_bp = Blueprint('professional', __name__)
 
+# Ordenamientos soportados para el listado; la última columna desempata
+SORT_ORDERS = {
+    'id': [(Professional.id, False)],
+    'rating': [(Professional.rating, True), (Professional.id, False)],
+}
+
+def parse_bool(value):
+    return value.lower() in ('1', 'true', 'yes')
+
 @professional_bp.route('/professionals', methods=['GET'])
+@cached('professionals')
+@query_budget(2)
 def get_professionals():
-    """Obtener todos los profesionales o filtrar por categoría"""
+    """Obtener profesionales paginados, con filtros y proyección de campos.
+
+    Parámetros: category, available, min_rating, location, specialty (se puede
+    repetir), sort (id|rating), fields (lista separada por comas), limit y cursor. El cursor de la página
+    siguiente se devuelve en la cabecera X-Next-Cursor.
+    """
+    query = Professional.query
+
     category = request.args.get('category')
-    
     if category:
-        professionals = Professional.query.filter_by(category=category).all()
-    else:
-        professionals = Professional.query.all()
-    
-    return jsonify([professional.to_dict() for professional in professionals])
+        query = query.filter(Professional.category == category)
+
+    available = request.args.get('available')
+    if available is not None:
+        query = query.filter(Professional.available == parse_bool(available))
+
+    location = request.args.get('location')
+    if location:
+        query = query.filter(Professional.location == location)
+
+    for specialty in request.args.getlist('specialty'):
+        query = query.filter(Professional.specialty_filter(specialty))
+
+    min_rating = request.args.get('min_rating')
+    if min_rating is not None:
+        try:
+            query = query.filter(Professional.rating >= float(min_rating))
+        except ValueError:
+            return jsonify({'error': 'Invalid min_rating'}), 400
+
+    order = SORT_ORDERS.get(request.args.get('sort', 'id'))
+    if order is None:
+        return jsonify({'error': 'Invalid sort'}), 400
+
+    fields = None
+    if request.args.get('fields'):
+        fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        unknown = [f for f in fields if f not in Professional.SERIALIZABLE_FIELDS]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        columns = {col for f in fields for col in Professional.field_columns(f)} | {col for col, _ in order}
+        query = query.options(load_only(*columns))
+    if fields is None or 'specialties' in fields:
+        query = query.options(Professional.with_specialties())
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        professionals, next_cursor = keyset_page(query, order, request.args.get('cursor'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify([professional.to_dict(fields) for professional in professionals])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        # to_dict(flat=False) conserva los parámetros repetidos (?specialty=A&specialty=B)
+        next_args = {**request.args.to_dict(flat=False), 'cursor': next_cursor}
+        response.headers['Link'] = f'<{url_for(request.endpoint, **next_args)}>; rel="next"'
+    return response
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+@professional_bp.route('/professionals/search', methods=['GET'])
+@cached('professionals')
+@query_budget(3)
+def search_professionals():
+    """Buscar profesionales por nombre, categoría, especialidades y descripción.
+
+    La búsqueda ignora mayúsculas y acentos, trata cada palabra como prefijo
+    y ordena por relevancia. Parámetros: q, category y limit.
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'Missing q'}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', SEARCH_DEFAULT_LIMIT)), SEARCH_MAX_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    ids = search_professional_ids(db.session, q, request.args.get('category'), limit)
+    if not ids:
+        return jsonify([])
+    professionals = Professional.query.options(Professional.with_specialties()).filter(Professional.id.in_(ids))
+    by_id = {p.id: p for p in professionals}
+    return jsonify([by_id[i].to_dict() for i in ids if i in by_id])
+
+NEARBY_DEFAULT_RADIUS_KM = 10.0
+NEARBY_MAX_RADIUS_KM = 50.0
+NEARBY_DEFAULT_LIMIT = 10
+NEARBY_MAX_LIMIT = 50
+
+@professional_bp.route('/professionals/nearby', methods=['GET'])
+@cached('professionals')
+@query_budget(2)
+def get_nearby_professionals():
+    """Obtener los profesionales disponibles más cercanos a un punto.
+
+    Parámetros: lat, lon, radius (km, máx. 50), category y limit. Sólo se
+    consultan las celdas de la grilla que cubren el radio pedido.
+    """
+    try:
+        lat, lon = parse_coordinates(request.args.get('lat'), request.args.get('lon'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        radius = float(request.args.get('radius', NEARBY_DEFAULT_RADIUS_KM))
+        limit = int(request.args.get('limit', NEARBY_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'Invalid radius or limit'}), 400
+    if not (0 < radius <= NEARBY_MAX_RADIUS_KM):
+        return jsonify({'error': f'radius must be between 0 and {NEARBY_MAX_RADIUS_KM:g} km'}), 400
+    limit = max(1, min(limit, NEARBY_MAX_LIMIT))
+
+    query = Professional.query.options(Professional.with_specialties()).filter(
+        Professional.geo_cell.in_(cells_within(lat, lon, radius)),
+        Professional.available == True
+    )
+    category = request.args.get('category')
+    if category:
+        query = query.filter(Professional.category == category)
+
+    candidates = []
+    for professional in query.all():
+        distance_km = haversine_km(lat, lon, professional.latitude, professional.longitude)
+        if distance_km <= radius:
+            candidates.append((distance_km, professional.id, professional))
+    candidates.sort(key=lambda c: c[:2])
+
+    results = []
+    for distance_km, _, professional in candidates[:limit]:
+        data = professional.to_dict()
+        data['distance_km'] = round(distance_km, 2)
+        data['distance'] = f'{distance_km:.1f} km'
+        results.append(data)
+    return jsonify(results)
+
+@professional_bp.route('/professionals/batch', methods=['GET'])
+@cached('professionals')
+@query_budget(2)
+def get_professionals_batch():
+    """Obtener varios profesionales por id (?ids=1,2,3, máx. 100) en una sola consulta.
+
+    La respuesta respeta el orden pedido; los ids inexistentes aparecen como
+    {"id": ..., "error": "Not found"}.
+    """
+    try:
+        ids = parse_ids(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query = Professional.query.options(Professional.with_specialties())
+    return jsonify(multi_get(query, Professional, ids, Professional.to_dict))
 
 @professional_bp.route('/professionals/<int:professional_id>', methods=['GET'])
+@cached('professional:{professional_id}')
 def get_professional(professional_id):
     """Obtener un profesional específico"""
     professional = Professional.query.get_or_404(professional_id)
     return jsonify(professional.to_dict())
 
 @professional_bp.route('/professionals', methods=['POST'])
+@login_required
 def create_professional():
-    """Crear un nuevo profesional"""
+    """Crear un nuevo profesional
+
+    rating y reviews_count no se aceptan: se derivan de las reseñas.
+    """
     data = request.json
-    import json
     
     professional = Professional(
         name=data['name'],
         category=data['category'],
-        rating=data.get('rating', 0.0),
-        reviews_count=data.get('reviews_count', 0),
         distance=data['distance'],
         available=data.get('available', True),
-        specialties=json.dumps(data.get('specialties', [])),
         price=data['price'],
         avatar=data['avatar'],
         phone=data.get('phone'),
         description=data.get('description'),
         location=data.get('location', 'Santa Fe')
     )
+    try:
+        professional.set_specialties(data.get('specialties'))
+        if 'latitude' in data or 'longitude' in data:
+            professional.set_coordinates(*parse_coordinates(data.get('latitude'), data.get('longitude')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     db.session.add(professional)
     db.session.commit()
+    invalidate('professionals')
     return jsonify(professional.to_dict()), 201
 
 @professional_bp.route('/professionals/<int:professional_id>', methods=['PUT'])
+@login_required
 def update_professional(professional_id):
     """Actualizar un profesional"""
     professional = Professional.query.get_or_404(professional_id)
     data = request.json
-    import json
+    name_changed = data.get('name', professional.name) != professional.name
     
     professional.name = data.get('name', professional.name)
     professional.category = data.get('category', professional.category)
-    professional.rating = data.get('rating', professional.rating)
-    professional.reviews_count = data.get('reviews_count', professional.reviews_count)
     professional.distance = data.get('distance', professional.distance)
     professional.available = data.get('available', professional.available)
     if 'specialties' in data:
-        professional.specialties = json.dumps(data['specialties'])
+        try:
+            professional.set_specialties(data['specialties'])
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
     professional.price = data.get('price', professional.price)
     professional.avatar = data.get('avatar', professional.avatar)
     professional.phone = data.get('phone', professional.phone)
     professional.description = data.get('description', professional.description)
     professional.location = data.get('location', professional.location)
     
+    if 'latitude' in data or 'longitude' in data:
+        if data.get('latitude') is None and data.get('longitude') is None:
+            professional.set_coordinates(None, None)
+        else:
+            try:
+                professional.set_coordinates(*parse_coordinates(
+                    data.get('latitude', professional.latitude),
+                    data.get('longitude', professional.longitude)
+                ))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+    
+    if name_changed:
+        # professional_name cambia en sus solicitudes: los clientes tienen que volver a leerlas
+        ChangeLog.record_select('service_requests', db.select(ServiceRequest.id).where(
+            ServiceRequest.professional_id == professional_id
+        ), 'update')
     db.session.commit()
+    invalidate('professionals', f'professional:{professional_id}')
+    if name_changed:
+        # Las solicitudes de servicio muestran el nombre del profesional
+        invalidate('service_requests')
     return jsonify(professional.to_dict())
 
 @professional_bp.route('/professionals/<int:professional_id>', methods=['DELETE'])
+@login_required
 def delete_professional(professional_id):
     """Eliminar un profesional"""
     professional = Professional.query.get_or_404(professional_id)
     db.session.delete(professional)
     db.session.commit()
+    invalidate('professionals', f'professional:{professional_id}', f'reviews:{professional_id}',
+               'reviews', 'service_requests')
     return '', 204
 
 @professional_bp.route('/professionals/<int:professional_id>/reviews', methods=['GET'])
+@cached('reviews:{professional_id}')
+@query_budget(2)
 def get_professional_reviews(professional_id):
     """Obtener las reseñas de un profesional"""
     professional = Professional.query.get_or_404(professional_id)
-    reviews = Review.query.filter_by(professional_id=professional_id).order_by(Review.created_at.desc()).all()
-    return jsonify([review.to_dict() for review in reviews])
+    query = Review.query.filter_by(professional_id=professional_id).order_by(Review.created_at.desc())
+    return json_list_response(query, Review.to_dict)
+
+@professional_bp.route('/professionals/<int:professional_id>/availability', methods=['GET'])
+@cached('availability:{professional_id}', 'professional:{professional_id}')
+@query_budget(2)
+def get_professional_availability(professional_id):
+    """Intervalos libres de un profesional.
+
+    Parámetros: from y to (YYYY-MM-DD, inclusive; por defecto los próximos 7
+    días) y duration (minutos mínimos de cada hueco, por defecto 60).
+    """
+    professional = Professional.query.options(
+        load_only(Professional.id, Professional.available)
+    ).get_or_404(professional_id)
+
+    try:
+        start, end = parse_date_range(request.args.get('from'), request.args.get('to'))
+        duration = int(request.args.get('duration', DEFAULT_DURATION_MINUTES))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not 1 <= duration <= MAX_DURATION_MINUTES:
+        return jsonify({'error': f'duration must be between 1 and {MAX_DURATION_MINUTES}'}), 400
+
+    slots = []
+    if professional.available:
+        window_start = datetime.combine(start, WORKDAY_START)
+        window_end = datetime.combine(end, WORKDAY_END)
+        busy = ServiceRequest.overlapping(professional_id, window_start, window_end).options(
+            load_only(ServiceRequest.start_at, ServiceRequest.end_at)
+        ).order_by(ServiceRequest.start_at).all()
+        slots = free_slots([(r.start_at, r.end_at) for r in busy], start, end, duration)
+
+    return jsonify({
+        'professional_id': professional_id,
+        'from': start,
+        'to': end,
+        'duration_minutes': duration,
+        'slots': [{'start': s, 'end': e} for s, e in slots]
+    })
 
 @professional_bp.route('/categories', methods=['GET'])
+@cached('categories', ttl=3600)
 def get_categories():
     """Obtener todas las categorías disponibles"""
-    categories = [
-        {'id': 'electricista', 'name': 'Electricista', 'icon': 'zap'},
-        {'id': 'plomero', 'name': 'Plomero', 'icon': 'droplets'},
-        {'id': 'carpintero', 'name': 'Carpintero', 'icon': 'hammer'},
-        {'id': 'pintor', 'name': 'Pintor', 'icon': 'paintbrush'},
-        {'id': 'mecanico', 'name': 'Mecánico', 'icon': 'wrench'},
-        {'id': 'peluquero', 'name': 'Peluquero', 'icon': 'scissors'}
-    ]
-    return jsonify(categories)
+    return jsonify(CATEGORIES)
+
+LEADERBOARD_DEFAULT_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 50
+
+@professional_bp.route('/categories/<category_id>/top', methods=['GET'])
+@cached('professionals')
+@query_budget(2)
+def get_category_top(category_id):
+    """Ranking de los profesionales disponibles de una categoría.
+
+    Ordena por el puntaje bayesiano materializado (leaderboard_score): un 5.0
+    con una reseña no supera a un 4.9 con doscientas. Parámetro: limit (máx. 50).
+    """
+    if category_id not in CATEGORY_IDS:
+        return jsonify({'error': 'Category not found'}), 404
+    try:
+        limit = max(1, min(int(request.args.get('limit', LEADERBOARD_DEFAULT_LIMIT)), LEADERBOARD_MAX_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    results = []
+    for rank, professional in enumerate(Professional.leaderboard(category_id, limit), start=1):
+        data = professional.to_dict()
+        data['rank'] = rank
+        data['score'] = round(professional.leaderboard_score, 3)
+        results.append(data)
+    return jsonify(results)
 
@@ -1,28 +1,43 @@
 from flask import Blueprint, jsonify, request
 from src.models.review import Review, db
 from src.models.professional import Professional
+from src.utils.query_budget import query_budget
+from src.utils.cache import cached, invalidate
+from src.utils.streaming import json_list_response
+from src.utils.auth import login_required
 
 review_bp = Blueprint('review', __name__)
 
+def is_valid_rating(value):
+    """Calificación entera de 1 a 5 (los agregados llevan una columna por estrella)"""
+    return isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= 5
+
+def invalidate_review_tags(professional_id):
+    """Una reseña cambia sus listados y también el rating del profesional"""
+    invalidate('reviews', f'reviews:{professional_id}', 'professionals', f'professional:{professional_id}')
+
 @review_bp.route('/reviews', methods=['GET'])
+@cached('reviews')
+@query_budget(1)
 def get_reviews():
-    """Obtener todas las reseñas"""
+    """Obtener todas las reseñas (con ?stream=1 se envían en streaming)"""
     professional_id = request.args.get('professional_id')
+    query = Review.query
     
     if professional_id:
-        reviews = Review.query.filter_by(professional_id=professional_id).order_by(Review.created_at.desc()).all()
-    else:
-        reviews = Review.query.order_by(Review.created_at.desc()).all()
+        query = query.filter_by(professional_id=professional_id)
     
-    return jsonify([review.to_dict() for review in reviews])
+    return json_list_response(query.order_by(Review.created_at.desc()), Review.to_dict)
 
 @review_bp.route('/reviews/<int:review_id>', methods=['GET'])
+@cached('reviews')
 def get_review(review_id):
     """Obtener una reseña específica"""
     review = Review.query.get_or_404(review_id)
     return jsonify(review.to_dict())
 
 @review_bp.route('/reviews', methods=['POST'])
+@login_required
 def create_review():
     """Crear una nueva reseña"""
     data = request.json
@@ -31,9 +46,9 @@ def create_review():
     professional = Professional.query.get_or_404(data['professional_id'])
     
     # Validar rating
-    rating = data.get('rating', 0)
-    if rating < 1 or rating > 5:
-        return jsonify({'error': 'Rating must be between 1 and 5'}), 400
+    rating = data.get('rating')
+    if not is_valid_rating(rating):
+        return jsonify({'error': 'Rating must be an integer between 1 and 5'}), 400
     
     review = Review(
         professional_id=data['professional_id'],
@@ -45,65 +60,53 @@ def create_review():
     
     db.session.add(review)
     
-    # Actualizar el rating promedio del profesional
-    all_reviews = Review.query.filter_by(professional_id=data['professional_id']).all()
-    if all_reviews:
-        avg_rating = sum(r.rating for r in all_reviews) / len(all_reviews)
-        professional.rating = round(avg_rating, 1)
-        professional.reviews_count = len(all_reviews)
+    # Actualizar los agregados del profesional en la misma transacción
+    Professional.apply_review_delta(professional.id, added=rating)
     
     db.session.commit()
+    invalidate_review_tags(review.professional_id)
     return jsonify(review.to_dict()), 201
 
 @review_bp.route('/reviews/<int:review_id>', methods=['PUT'])
+@login_required
 def update_review(review_id):
     """Actualizar una reseña"""
     review = Review.query.get_or_404(review_id)
     data = request.json
     
+    previous_rating = review.rating
+    
     # Validar rating si se proporciona
     if 'rating' in data:
         rating = data['rating']
-        if rating < 1 or rating > 5:
-            return jsonify({'error': 'Rating must be between 1 and 5'}), 400
+        if not is_valid_rating(rating):
+            return jsonify({'error': 'Rating must be an integer between 1 and 5'}), 400
         review.rating = rating
     
     review.client_name = data.get('client_name', review.client_name)
     review.client_avatar = data.get('client_avatar', review.client_avatar)
     review.comment = data.get('comment', review.comment)
     
-    # Recalcular el rating promedio del profesional
-    professional = Professional.query.get(review.professional_id)
-    if professional:
-        all_reviews = Review.query.filter_by(professional_id=review.professional_id).all()
-        if all_reviews:
-            avg_rating = sum(r.rating for r in all_reviews) / len(all_reviews)
-            professional.rating = round(avg_rating, 1)
-            professional.reviews_count = len(all_reviews)
+    # Ajustar los agregados del profesional si cambió la calificación
+    if review.rating != previous_rating:
+        Professional.apply_review_delta(review.professional_id, added=review.rating, removed=previous_rating)
     
     db.session.commit()
+    invalidate_review_tags(review.professional_id)
     return jsonify(review.to_dict())
 
 @review_bp.route('/reviews/<int:review_id>', methods=['DELETE'])
+@login_required
 def delete_review(review_id):
     """Eliminar una reseña"""
     review = Review.query.get_or_404(review_id)
-    professional_id = review.professional_id
     
     db.session.delete(review)
     
-    # Recalcular el rating promedio del profesional
-    professional = Professional.query.get(professional_id)
-    if professional:
-        remaining_reviews = Review.query.filter_by(professional_id=professional_id).all()
-        if remaining_reviews:
-            avg_rating = sum(r.rating for r in remaining_reviews) / len(remaining_reviews)
-            professional.rating = round(avg_rating, 1)
-            professional.reviews_count = len(remaining_reviews)
-        else:
-            professional.rating = 0.0
-            professional.reviews_count = 0
+    # Descontar la reseña de los agregados del profesional
+    Professional.apply_review_delta(review.professional_id, removed=review.rating)
     
     db.session.commit()
+    invalidate_review_tags(review.professional_id)
     return '', 204
 
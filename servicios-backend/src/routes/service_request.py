@@ -1,98 +1,361 @@
 from flask import Blueprint, jsonify, request
-from src.models.service_request import ServiceRequest, db
+from werkzeug.exceptions import NotFound
+from src.models.service_request import BLOCKING_STATUSES, DEFAULT_DURATION_MINUTES, VALID_STATUSES, ServiceRequest, db
 from src.models.professional import Professional
+from src.utils.batch import MAX_BATCH_OPERATIONS, multi_get, parse_ids
+from src.utils.query_budget import query_budget
+from src.utils.cache import cached, invalidate
+from src.utils.streaming import json_list_response
+from src.utils.outbox import record_event
+from src.utils.event_stream import event_stream, parse_last_event_id
+from src.utils.auth import login_required
 from datetime import datetime
 
 service_request_bp = Blueprint('service_request', __name__)
 
-@service_request_bp.route('/service-requests', methods=['GET'])
-def get_service_requests():
-    """Obtener todas las solicitudes de servicio"""
-    professional_id = request.args.get('professional_id')
-    
-    if professional_id:
-        requests = ServiceRequest.query.filter_by(professional_id=professional_id).all()
-    else:
-        requests = ServiceRequest.query.all()
-    
-    return jsonify([req.to_dict() for req in requests])
+class ScheduleConflict(Exception):
+    """El turno se pisa con otras reservas activas del profesional"""
 
-@service_request_bp.route('/service-requests/<int:request_id>', methods=['GET'])
-def get_service_request(request_id):
-    """Obtener una solicitud específica"""
-    service_request = ServiceRequest.query.get_or_404(request_id)
-    return jsonify(service_request.to_dict())
+    def __init__(self, conflicts):
+        super().__init__('Time slot not available')
+        self.conflicts = conflicts
 
-@service_request_bp.route('/service-requests', methods=['POST'])
-def create_service_request():
-    """Crear una nueva solicitud de servicio"""
-    data = request.json
-    
-    # Validar que el profesional existe
-    professional = Professional.query.get_or_404(data['professional_id'])
-    
-    # Parsear fecha y hora
+def conflict_body(conflicts):
+    return {
+        'error': 'Time slot not available',
+        'conflicts': [
+            {'id': c.id, 'start_at': c.start_at, 'end_at': c.end_at}
+            for c in conflicts
+        ]
+    }
+
+def conflict_response(conflicts):
+    return jsonify(conflict_body(conflicts)), 409
+
+def invalidate_schedule(*professional_ids):
+    invalidate('service_requests', *[f'availability:{pid}' for pid in professional_ids])
+
+def check_schedule(service_request):
+    """Verifica el turno con la agenda del profesional bloqueada; lanza ScheduleConflict"""
+    ServiceRequest.lock_schedule(service_request.professional_id)
+    with db.session.no_autoflush:
+        conflicts = service_request.find_conflicts()
+    if conflicts:
+        raise ScheduleConflict(conflicts)
+
+def create_from_data(professional, data):
+    """Alta de una solicitud pendiente con su evento, sin commit.
+
+    Lanza KeyError si falta un campo, TypeError si alguno llega con otro tipo
+    (p. ej. null), ValueError si no es válido y ScheduleConflict si el turno
+    está ocupado.
+    """
     service_date = datetime.strptime(data['service_date'], '%Y-%m-%d').date()
     service_time = datetime.strptime(data['service_time'], '%H:%M').time()
     
     service_request = ServiceRequest(
         client_name=data['client_name'],
         client_phone=data['client_phone'],
-        professional_id=data['professional_id'],
-        service_date=service_date,
-        service_time=service_time,
+        professional_id=professional.id,
         address=data['address'],
         description=data['description'],
         estimated_budget=data.get('estimated_budget'),
         status='pending'
     )
+    service_request.set_schedule(service_date, service_time,
+                                 int(data.get('duration_minutes', DEFAULT_DURATION_MINUTES)))
+    check_schedule(service_request)
     
     db.session.add(service_request)
-    db.session.commit()
-    return jsonify(service_request.to_dict()), 201
+    db.session.flush()
+    record_event('service_request.created', service_request)
+    return service_request
 
-@service_request_bp.route('/service-requests/<int:request_id>', methods=['PUT'])
-def update_service_request(request_id):
-    """Actualizar una solicitud de servicio"""
-    service_request = ServiceRequest.query.get_or_404(request_id)
-    data = request.json
-    
+def update_from_data(service_request, data):
+    """Aplica los campos de un PUT y registra el evento, sin commit (mismas excepciones que el alta)"""
+    previous_status = service_request.status
     service_request.client_name = data.get('client_name', service_request.client_name)
     service_request.client_phone = data.get('client_phone', service_request.client_phone)
     
+    service_date = service_request.service_date
     if 'service_date' in data:
-        service_request.service_date = datetime.strptime(data['service_date'], '%Y-%m-%d').date()
+        service_date = datetime.strptime(data['service_date'], '%Y-%m-%d').date()
     
+    service_time = service_request.service_time
     if 'service_time' in data:
-        service_request.service_time = datetime.strptime(data['service_time'], '%H:%M').time()
+        service_time = datetime.strptime(data['service_time'], '%H:%M').time()
+    
+    service_request.set_schedule(service_date, service_time,
+                                 int(data.get('duration_minutes', service_request.duration_minutes)))
     
     service_request.address = data.get('address', service_request.address)
     service_request.description = data.get('description', service_request.description)
     service_request.estimated_budget = data.get('estimated_budget', service_request.estimated_budget)
     service_request.status = data.get('status', service_request.status)
     
+    # Sólo hace falta verificar si la solicitud sigue ocupando la agenda
+    if service_request.status in BLOCKING_STATUSES:
+        check_schedule(service_request)
+    
+    if service_request.status != previous_status:
+        record_event('service_request.status_changed', service_request, previous_status=previous_status)
+    else:
+        record_event('service_request.updated', service_request)
+
+def change_status(service_request, status):
+    """Cambia sólo el estado y registra el evento, sin commit; lanza ValueError o ScheduleConflict"""
+    if status not in VALID_STATUSES:
+        raise ValueError('Invalid status')
+    
+    # Reactivar una solicitud rechazada vuelve a ocupar su turno
+    previous_status = service_request.status
+    reactivated = previous_status not in BLOCKING_STATUSES and status in BLOCKING_STATUSES
+    service_request.status = status
+    if reactivated:
+        check_schedule(service_request)
+    
+    if service_request.status != previous_status:
+        record_event('service_request.status_changed', service_request, previous_status=previous_status)
+
+@service_request_bp.route('/service-requests', methods=['GET'])
+@cached('service_requests')
+@query_budget(1)
+def get_service_requests():
+    """Obtener todas las solicitudes de servicio (con ?stream=1 se envían en streaming)"""
+    professional_id = request.args.get('professional_id')
+    status = request.args.get('status')
+    query = ServiceRequest.query.options(ServiceRequest.with_professional())
+    
+    if professional_id:
+        query = query.filter_by(professional_id=professional_id)
+    if status:
+        query = query.filter_by(status=status)
+    
+    return json_list_response(query, ServiceRequest.to_dict)
+
+@service_request_bp.route('/service-requests/<int:request_id>', methods=['GET'])
+@cached('service_requests')
+@query_budget(1)
+def get_service_request(request_id):
+    """Obtener una solicitud específica"""
+    service_request = ServiceRequest.query.options(ServiceRequest.with_professional()).get_or_404(request_id)
+    return jsonify(service_request.to_dict())
+
+@service_request_bp.route('/service-requests/batch', methods=['GET'])
+@cached('service_requests')
+@query_budget(1)
+def get_service_requests_batch():
+    """Obtener varias solicitudes por id (?ids=1,2,3, máx. 100) en una sola consulta.
+
+    La respuesta respeta el orden pedido; los ids inexistentes aparecen como
+    {"id": ..., "error": "Not found"}.
+    """
+    try:
+        ids = parse_ids(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query = ServiceRequest.query.options(ServiceRequest.with_professional())
+    return jsonify(multi_get(query, ServiceRequest, ids, ServiceRequest.to_dict))
+
+@service_request_bp.route('/service-requests', methods=['POST'])
+@login_required
+def create_service_request():
+    """Crear una nueva solicitud de servicio"""
+    data = request.json
+    
+    try:
+        # Validar que el profesional existe
+        professional = Professional.query.get_or_404(data['professional_id'])
+        service_request = create_from_data(professional, data)
+    except KeyError as e:
+        db.session.rollback()
+        return jsonify({'error': f'Missing field {e.args[0]}'}), 400
+    except TypeError:
+        db.session.rollback()
+        return jsonify({'error': 'Invalid field type'}), 400
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except ScheduleConflict as e:
+        db.session.rollback()
+        return conflict_response(e.conflicts)
+    
+    db.session.commit()
+    invalidate_schedule(professional.id)
+    return jsonify(service_request.to_dict()), 201
+
+@service_request_bp.route('/service-requests/<int:request_id>', methods=['PUT'])
+@login_required
+def update_service_request(request_id):
+    """Actualizar una solicitud de servicio"""
+    service_request = ServiceRequest.query.get_or_404(request_id)
+    
+    try:
+        update_from_data(service_request, request.json)
+    except KeyError as e:
+        db.session.rollback()
+        return jsonify({'error': f'Missing field {e.args[0]}'}), 400
+    except TypeError:
+        db.session.rollback()
+        return jsonify({'error': 'Invalid field type'}), 400
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except ScheduleConflict as e:
+        db.session.rollback()
+        return conflict_response(e.conflicts)
+    
     db.session.commit()
+    invalidate_schedule(service_request.professional_id)
     return jsonify(service_request.to_dict())
 
 @service_request_bp.route('/service-requests/<int:request_id>', methods=['DELETE'])
+@login_required
 def delete_service_request(request_id):
     """Eliminar una solicitud de servicio"""
     service_request = ServiceRequest.query.get_or_404(request_id)
+    record_event('service_request.deleted', service_request)
     db.session.delete(service_request)
     db.session.commit()
+    invalidate_schedule(service_request.professional_id)
     return '', 204
 
 @service_request_bp.route('/service-requests/<int:request_id>/status', methods=['PUT'])
+@login_required
 def update_request_status(request_id):
     """Actualizar solo el estado de una solicitud"""
     service_request = ServiceRequest.query.get_or_404(request_id)
-    data = request.json
     
-    valid_statuses = ['pending', 'accepted', 'rejected', 'completed']
-    if data.get('status') not in valid_statuses:
-        return jsonify({'error': 'Invalid status'}), 400
+    try:
+        change_status(service_request, request.json.get('status'))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except ScheduleConflict as e:
+        db.session.rollback()
+        return conflict_response(e.conflicts)
     
-    service_request.status = data['status']
     db.session.commit()
+    invalidate_schedule(service_request.professional_id)
     return jsonify(service_request.to_dict())
 
+def _stream(channel):
+    # EventSource reenvía Last-Event-ID al reconectar; los polyfills lo mandan como parámetro
+    last_event_id = parse_last_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    return event_stream([channel], last_event_id, request.args.get('timeout', type=float))
+
+@service_request_bp.route('/professionals/<int:professional_id>/service-requests/stream', methods=['GET'])
+@query_budget(1)
+def stream_professional_requests(professional_id):
+    """Stream SSE de las solicitudes de un profesional: altas, ediciones, cambios de estado y bajas.
+
+    Reemplaza el polling de GET /service-requests?professional_id=. Cada
+    evento lleva la solicitud completa; con ?timeout=0 sólo se reenvían los
+    eventos posteriores a Last-Event-ID y la respuesta termina.
+    """
+    Professional.query.get_or_404(professional_id)
+    return _stream(f'professional:{professional_id}')
+
+@service_request_bp.route('/service-requests/<int:request_id>/stream', methods=['GET'])
+@query_budget(1)
+def stream_service_request(request_id):
+    """Stream SSE de una solicitud, para que el cliente que la hizo siga su estado"""
+    ServiceRequest.query.get_or_404(request_id)
+    return _stream(f'service_request:{request_id}')
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _apply_operation(operation, requests_by_id, professionals_by_id):
+    """Aplica una operación del lote y devuelve (código HTTP, solicitud)"""
+    if not isinstance(operation, dict):
+        raise ValueError('Each operation must be an object')
+    kind = operation.get('op')
+    if kind == 'status':
+        service_request = requests_by_id.get(operation.get('id'))
+        if service_request is None:
+            raise NotFound('Service request not found')
+        change_status(service_request, operation.get('status'))
+        return 200, service_request
+    
+    data = operation.get('data')
+    if not isinstance(data, dict):
+        raise ValueError('data must be an object')
+    if kind == 'create':
+        professional = professionals_by_id.get(data.get('professional_id'))
+        if professional is None:
+            raise NotFound('Professional not found')
+        return 201, create_from_data(professional, data)
+    if kind == 'update':
+        service_request = requests_by_id.get(operation.get('id'))
+        if service_request is None:
+            raise NotFound('Service request not found')
+        update_from_data(service_request, data)
+        return 200, service_request
+    raise ValueError('op must be one of create, update, status')
+
+@service_request_bp.route('/service-requests/batch', methods=['POST'])
+@login_required
+def batch_service_requests():
+    """Aplicar altas, ediciones y cambios de estado en una sola transacción.
+
+    Cuerpo: {"operations": [{"op": "create", "data": {...}},
+    {"op": "update", "id": 1, "data": {...}}, {"op": "status", "id": 2, "status": "accepted"}]}
+    (máx. 100), en orden. Devuelve el resultado de cada operación. Si alguna
+    falla no se aplica ninguna: la respuesta lleva el código de la que falló,
+    y las demás figuran con 424.
+    """
+    body = request.get_json(silent=True)
+    operations = body.get('operations') if isinstance(body, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({'error': f'At most {MAX_BATCH_OPERATIONS} operations per request'}), 400
+    
+    # Las filas referenciadas se traen de antemano con una consulta IN por tabla
+    operations_with_data = [op for op in operations if isinstance(op, dict)]
+    request_ids = {op.get('id') for op in operations_with_data if _is_id(op.get('id'))}
+    professional_ids = {
+        op['data'].get('professional_id') for op in operations_with_data
+        if op.get('op') == 'create' and isinstance(op.get('data'), dict) and _is_id(op['data'].get('professional_id'))
+    }
+    requests_by_id = {}
+    if request_ids:
+        query = ServiceRequest.query.options(ServiceRequest.with_professional())
+        requests_by_id = {r.id: r for r in query.filter(ServiceRequest.id.in_(request_ids))}
+    professionals_by_id = {}
+    if professional_ids:
+        professionals_by_id = {p.id: p for p in Professional.query.filter(Professional.id.in_(professional_ids))}
+    
+    results = []
+    touched = set()
+    for index, operation in enumerate(operations):
+        error = None
+        try:
+            status, service_request = _apply_operation(operation, requests_by_id, professionals_by_id)
+            # Las operaciones siguientes tienen que ver este cambio al buscar conflictos
+            db.session.flush()
+        except KeyError as e:
+            error = 400, {'error': f'Missing field {e.args[0]}'}
+        except TypeError:
+            error = 400, {'error': 'Invalid field type'}
+        except ValueError as e:
+            error = 400, {'error': str(e)}
+        except NotFound as e:
+            error = 404, {'error': e.description}
+        except ScheduleConflict as e:
+            error = 409, conflict_body(e.conflicts)
+        if error:
+            db.session.rollback()
+            status, body = error
+            results = [{'index': i, 'status': 424, 'error': 'Rolled back'} for i in range(index)]
+            results.append({'index': index, 'status': status, **body})
+            results += [{'index': i, 'status': 424, 'error': 'Not applied'}
+                        for i in range(index + 1, len(operations))]
+            return jsonify({'error': 'Batch rolled back', 'failed_index': index, 'results': results}), status
+        touched.add(service_request.professional_id)
+        results.append({'index': index, 'status': status, 'data': service_request.to_dict()})
+    
+    db.session.commit()
+    invalidate_schedule(*touched)
+    return jsonify({'results': results})
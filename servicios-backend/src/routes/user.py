@@ -1,14 +1,16 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
+from src.utils.streaming import json_list_response
+from src.utils.auth import forget_user, login_required
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    return json_list_response(User.query, User.to_dict)
 
 @user_bp.route('/users', methods=['POST'])
+@login_required
 def create_user():
     
     data = request.json
@@ -23,17 +25,21 @@ def get_user(user_id):
     return jsonify(user.to_dict())
 
 @user_bp.route('/users/<int:user_id>', methods=['PUT'])
+@login_required
 def update_user(user_id):
     user = User.query.get_or_404(user_id)
     data = request.json
     user.username = data.get('username', user.username)
     user.email = data.get('email', user.email)
     db.session.commit()
+    forget_user(user_id)
     return jsonify(user.to_dict())
 
 @user_bp.route('/users/<int:user_id>', methods=['DELETE'])
+@login_required
 def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    forget_user(user_id)
     return '', 204
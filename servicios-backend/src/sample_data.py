@@ -0,0 +1,140 @@
+from src.models.user import db
+from src.models.professional import Professional
+from src.models.review import Review
+
+def init_sample_data():
+    """Initialize sample data for testing"""
+    # Check if data already exists
+    if Professional.query.first():
+        return
+    
+    # Sample professionals
+    professionals_data = [
+        {
+            'name': 'Juan Pérez',
+            'category': 'electricista',
+            'distance': '0.5 km',
+            'latitude': -31.6288,
+            'longitude': -60.7,
+            'available': True,
+            'specialties': ['Instalaciones', 'Reparaciones'],
+            'price': '$5,000',
+            'avatar': 'JP',
+            'phone': '+54 9 342 123-4567',
+            'description': 'Electricista con más de 10 años de experiencia en instalaciones residenciales y comerciales.'
+        },
+        {
+            'name': 'María González',
+            'category': 'electricista',
+            'distance': '1.2 km',
+            'latitude': -31.6333,
+            'longitude': -60.6873,
+            'available': True,
+            'specialties': ['Instalaciones', 'Mantenimiento'],
+            'price': '$4,500',
+            'avatar': 'MG',
+            'phone': '+54 9 342 234-5678',
+            'description': 'Especialista en sistemas eléctricos modernos y domótica.'
+        },
+        {
+            'name': 'Carlos Rodríguez',
+            'category': 'electricista',
+            'distance': '2.1 km',
+            'latitude': -31.6522,
+            'longitude': -60.7,
+            'available': False,
+            'specialties': ['Reparaciones', 'Emergencias'],
+            'price': '$6,000',
+            'avatar': 'CR',
+            'phone': '+54 9 342 345-6789',
+            'description': 'Servicio de emergencias 24/7 para reparaciones eléctricas urgentes.'
+        },
+        {
+            'name': 'Ana Martínez',
+            'category': 'plomero',
+            'distance': '0.8 km',
+            'latitude': -31.6333,
+            'longitude': -60.7085,
+            'available': True,
+            'specialties': ['Reparaciones', 'Instalaciones'],
+            'price': '$4,000',
+            'avatar': 'AM',
+            'phone': '+54 9 342 456-7890',
+            'description': 'Plomera especializada en reparaciones de cañerías y grifería.'
+        },
+        {
+            'name': 'Luis Fernández',
+            'category': 'carpintero',
+            'distance': '1.5 km',
+            'latitude': -31.6198,
+            'longitude': -60.6937,
+            'available': True,
+            'specialties': ['Muebles', 'Reparaciones'],
+            'price': '$3,500',
+            'avatar': 'LF',
+            'phone': '+54 9 342 567-8901',
+            'description': 'Carpintero artesanal especializado en muebles a medida y restauración.'
+        }
+    ]
+    
+    for prof_data in professionals_data:
+        professional = Professional(
+            name=prof_data['name'],
+            category=prof_data['category'],
+            distance=prof_data['distance'],
+            available=prof_data['available'],
+            price=prof_data['price'],
+            avatar=prof_data['avatar'],
+            phone=prof_data['phone'],
+            description=prof_data['description']
+        )
+        professional.set_coordinates(prof_data['latitude'], prof_data['longitude'])
+        professional.set_specialties(prof_data['specialties'])
+        db.session.add(professional)
+    
+    # Sample reviews
+    reviews_data = [
+        {
+            'professional_id': 1,
+            'client_name': 'Ana Cliente',
+            'client_avatar': 'AC',
+            'rating': 5,
+            'comment': 'Excelente trabajo, muy profesional y puntual.'
+        },
+        {
+            'professional_id': 1,
+            'client_name': 'José Morales',
+            'client_avatar': 'JM',
+            'rating': 4,
+            'comment': 'Buen servicio, resolvió el problema rápidamente.'
+        },
+        {
+            'professional_id': 2,
+            'client_name': 'Laura Pérez',
+            'client_avatar': 'LP',
+            'rating': 5,
+            'comment': 'Muy recomendable, trabajo de calidad.'
+        },
+        {
+            'professional_id': 4,
+            'client_name': 'Roberto Silva',
+            'client_avatar': 'RS',
+            'rating': 5,
+            'comment': 'Solucionó la fuga de agua perfectamente.'
+        }
+    ]
+    
+    for review_data in reviews_data:
+        review = Review(
+            professional_id=review_data['professional_id'],
+            client_name=review_data['client_name'],
+            client_avatar=review_data['client_avatar'],
+            rating=review_data['rating'],
+            comment=review_data['comment']
+        )
+        db.session.add(review)
+    
+    db.session.flush()
+    Professional.rebuild_rating_aggregates()
+    Professional.rebuild_leaderboards()
+    db.session.commit()
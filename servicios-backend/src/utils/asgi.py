@@ -0,0 +1,171 @@
+import asyncio
+import contextlib
+import sys
+import tempfile
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.util import greenlet_spawn
+from sqlalchemy.util.concurrency import await_only
+
+# Driver async por motor: el engine es el mismo que arma create_async_engine
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+# Cuerpos más grandes que esto se pasan a un archivo temporal (p. ej. importaciones NDJSON)
+BODY_SPOOL_SIZE = 1024 * 1024
+
+
+def async_database_uri(uri):
+    """La misma URI con el driver async del motor (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    url = make_url(uri)
+    if url.get_dialect().is_async:
+        return uri
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f'No async driver configured for {url.get_backend_name()}')
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        # WSGI pasa la ruta como bytes decodificados en latin-1
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+
+class ASGIBridge:
+    """Aplicación ASGI que sirve la app Flask en el event loop.
+
+    Cada request corre en un greenlet (greenlet_spawn de SQLAlchemy, lo mismo
+    que usa AsyncSession). Las vistas no cambian: con los drivers async,
+    cada consulta cede el event loop mientras espera a la base, así que un
+    proceso atiende muchos requests lentos a la vez. Las respuestas en
+    streaming se generan de a un fragmento por greenlet.
+    """
+
+    def __init__(self, wsgi_app, on_shutdown=None):
+        self.wsgi_app = wsgi_app
+        # Se llama en un greenlet al apagar el servidor (p. ej. para cerrar los pools)
+        self.on_shutdown = on_shutdown
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.on_shutdown is not None:
+                    await greenlet_spawn(self.on_shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive):
+        body = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_SIZE)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            body.write(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        body.seek(0)
+        return body
+
+    async def _wait_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    def _respond(self, environ, send, streaming):
+        """Corre la app y envía la respuesta desde un único greenlet.
+
+        Cada greenlet tiene su propio contexto de contextvars: si los fragmentos
+        se pidieran en greenlets distintos, stream_with_context abriría el
+        contexto del request en uno y lo cerraría en otro (ValueError).
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+        def send_start():
+            await_only(send({'type': 'http.response.start', 'status': started['status'],
+                             'headers': started['headers']}))
+            streaming.set()
+
+        iterable = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in iterable:
+                # start_response puede llegar recién con el primer fragmento
+                if not streaming.is_set():
+                    send_start()
+                if chunk:
+                    await_only(send({'type': 'http.response.body', 'body': chunk, 'more_body': True}))
+            if not streaming.is_set():
+                send_start()
+            await_only(send({'type': 'http.response.body', 'body': b''}))
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+
+    async def _http(self, scope, receive, send):
+        body = await self._read_body(receive)
+        streaming = asyncio.Event()
+        response = asyncio.ensure_future(greenlet_spawn(self._respond, _environ(scope, body), send, streaming))
+        # Con el cuerpo ya leído nadie más escucha receive(): si el cliente se
+        # desconecta a mitad de un stream (SSE) se corta ahí, en vez de seguir
+        # generando hasta SSE_MAX_STREAM_SECONDS
+        disconnect = asyncio.ensure_future(self._wait_disconnect(receive))
+        started = asyncio.ensure_future(streaming.wait())
+        try:
+            await asyncio.wait((response, disconnect), return_when=asyncio.FIRST_COMPLETED)
+            if not response.done():
+                # Una vista a mitad de camino (p. ej. una escritura) termina igual;
+                # sólo se corta el envío del cuerpo
+                await asyncio.wait((response, started), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+            started.cancel()
+            # La cancelación llega al greenlet que espera el próximo fragmento;
+            # el iterable se cierra en el mismo greenlet
+            response.cancel()
+            try:
+                with contextlib.suppress(asyncio.CancelledError):
+                    await response
+            finally:
+                body.close()
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+TOKEN_SALT = 'auth-token'
+
+
+class UserCache:
+    """LRU con TTL de usuarios ya resueltos ({id: (datos, token_version)}).
+
+    Cada worker tiene la suya; una revocación hecha en otro worker se ve aquí
+    cuando la entrada vence, a más tardar a los `ttl` segundos.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return value
+
+    def set(self, user_id, value):
+        with self._lock:
+            self._entries[user_id] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=TOKEN_SALT)
+
+
+def issue_token(user):
+    """Token firmado con el id del usuario y su versión de tokens"""
+    return _serializer().dumps({'uid': user.id, 'v': user.token_version or 0})
+
+
+def _resolve_user(user_id):
+    """Datos del usuario desde la caché; sólo consulta la base si no está"""
+    from src.models.user import User
+
+    cache = current_app.extensions['auth_user_cache']
+    cached = cache.get(user_id)
+    if cached is None:
+        user = User.query.get(user_id)
+        if user is None:
+            return None
+        cached = (user.to_dict(), user.token_version or 0)
+        cache.set(user_id, cached)
+    return cached
+
+
+def login_required(view):
+    """Exige un token "Authorization: Bearer <token>" válido.
+
+    La firma y el vencimiento se verifican sin acceder a la base; el usuario
+    queda disponible en g.current_user.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return jsonify({'error': 'Missing token'}), 401
+        try:
+            payload = _serializer().loads(
+                header[len('Bearer '):], max_age=current_app.config['AUTH_TOKEN_MAX_AGE']
+            )
+        except SignatureExpired:
+            return jsonify({'error': 'Token expired'}), 401
+        except BadSignature:
+            return jsonify({'error': 'Invalid token'}), 401
+
+        resolved = _resolve_user(payload['uid'])
+        if resolved is None or resolved[1] != payload['v']:
+            return jsonify({'error': 'Token revoked'}), 401
+        g.current_user = resolved[0]
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def revoke_user_tokens(user):
+    """Invalida todos los tokens emitidos al usuario; llamar a forget_user tras el commit"""
+    user.token_version = (user.token_version or 0) + 1
+
+
+def forget_user(user_id):
+    """Quita al usuario de la caché de este worker (tras modificarlo o borrarlo)"""
+    current_app.extensions['auth_user_cache'].evict(user_id)
+
+
+def init_auth(app):
+    app.config.setdefault('AUTH_TOKEN_MAX_AGE', 7 * 24 * 3600)
+    app.config.setdefault('AUTH_USER_CACHE_SIZE', 1024)
+    app.config.setdefault('AUTH_USER_CACHE_TTL', 60)
+    app.extensions['auth_user_cache'] = UserCache(
+        app.config['AUTH_USER_CACHE_SIZE'], app.config['AUTH_USER_CACHE_TTL']
+    )
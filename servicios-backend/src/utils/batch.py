@@ -0,0 +1,25 @@
+MAX_BATCH_IDS = 100
+MAX_BATCH_OPERATIONS = 100
+
+
+def parse_ids(args):
+    """Ids de ?ids=1,2,3 (o ?ids=1&ids=2) en el orden pedido; lanza ValueError si no son válidos"""
+    raw = [value.strip() for param in args.getlist('ids') for value in param.split(',') if value.strip()]
+    if not raw:
+        raise ValueError('Missing ids')
+    try:
+        ids = [int(value) for value in raw]
+    except ValueError:
+        raise ValueError('ids must be integers')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f'At most {MAX_BATCH_IDS} ids per request')
+    return ids
+
+
+def multi_get(query, model, ids, serialize):
+    """Resuelve todos los ids con una sola consulta IN y respeta el orden pedido.
+
+    Los ids inexistentes quedan en su lugar como {'id': ..., 'error': 'Not found'}.
+    """
+    found = {item.id: item for item in query.filter(model.id.in_(set(ids)))}
+    return [serialize(found[i]) if i in found else {'id': i, 'error': 'Not found'} for i in ids]
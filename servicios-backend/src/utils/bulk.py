@@ -0,0 +1,226 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert
+
+from src.models.user import db
+from src.models.category import DEFAULT_PRIOR_MEAN, CategoryPrior
+from src.models.change_log import ChangeLog
+from src.models.professional import Professional
+from src.models.review import Review
+from src.models.service_request import DEFAULT_DURATION_MINUTES, MAX_DURATION_MINUTES, VALID_STATUSES, ServiceRequest
+from src.models.specialty import ProfessionalSpecialty
+from src.routes.review import is_valid_rating
+from src.utils.geo import grid_cell, parse_coordinates
+from src.utils.search import build_search_text
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def _professional_row(data):
+    specialties = Professional.clean_specialties(data.get('specialties'))
+    row = {
+        'name': data['name'],
+        'category': data['category'],
+        'rating': 0.0,
+        'reviews_count': 0,
+        'distance': data['distance'],
+        'available': bool(data.get('available', True)),
+        'price': data['price'],
+        'avatar': data['avatar'],
+        'phone': data.get('phone'),
+        'description': data.get('description'),
+        'location': data.get('location', 'Santa Fe'),
+        'latitude': None,
+        'longitude': None,
+        'geo_cell': None,
+        'search_text': build_search_text(
+            data['name'], data['category'], ' '.join(specialties), data.get('description')
+        ),
+    }
+    if data.get('latitude') is not None or data.get('longitude') is not None:
+        lat, lon = parse_coordinates(data.get('latitude'), data.get('longitude'))
+        row.update(latitude=lat, longitude=lon, geo_cell=grid_cell(lat, lon))
+    return row, specialties
+
+
+def _review_row(data):
+    # Mismo criterio que POST /reviews: 4.7, true o "3" son errores, no se redondean
+    if not is_valid_rating(data['rating']):
+        raise ValueError('Rating must be an integer between 1 and 5')
+    row = {
+        'professional_id': int(data['professional_id']),
+        'client_name': data['client_name'],
+        'client_avatar': data['client_avatar'],
+        'rating': data['rating'],
+        'comment': data['comment'],
+        'created_at': datetime.fromisoformat(data['created_at']) if data.get('created_at') else datetime.utcnow(),
+    }
+    return row, None
+
+
+def _service_request_row(data):
+    status = data.get('status', 'pending')
+    if status not in VALID_STATUSES:
+        raise ValueError('Invalid status')
+    service_date = datetime.strptime(data['service_date'], '%Y-%m-%d').date()
+    service_time = datetime.strptime(data['service_time'], '%H:%M').time()
+    duration = int(data.get('duration_minutes', DEFAULT_DURATION_MINUTES))
+    if not 1 <= duration <= MAX_DURATION_MINUTES:
+        raise ValueError(f'duration_minutes must be between 1 and {MAX_DURATION_MINUTES}')
+    start_at = datetime.combine(service_date, service_time)
+    row = {
+        'client_name': data['client_name'],
+        'client_phone': data['client_phone'],
+        'professional_id': int(data['professional_id']),
+        'service_date': service_date,
+        'service_time': service_time,
+        'duration_minutes': duration,
+        'start_at': start_at,
+        'end_at': start_at + timedelta(minutes=duration),
+        'address': data['address'],
+        'description': data['description'],
+        'estimated_budget': data.get('estimated_budget'),
+        'status': status,
+        'created_at': datetime.fromisoformat(data['created_at']) if data.get('created_at') else datetime.utcnow(),
+    }
+    return row, None
+
+
+def _insert_professionals(rows, extras):
+    # Sin reseñas, el puntaje del ranking es la media de la categoría
+    means = CategoryPrior.means()
+    for row in rows:
+        row['leaderboard_score'] = means.get(row['category'], DEFAULT_PRIOR_MEAN)
+    ids = db.session.scalars(
+        insert(Professional).returning(Professional.id, sort_by_parameter_order=True), rows
+    ).all()
+    links = [
+        {'professional_id': professional_id, 'slug': slug, 'name': name, 'position': position}
+        for professional_id, specialties in zip(ids, extras)
+        for position, (slug, name) in enumerate(_unique_specialties(specialties))
+    ]
+    if links:
+        db.session.execute(insert(ProfessionalSpecialty), links)
+    ChangeLog.record('professionals', ids, 'insert')
+    return ['professionals']
+
+
+def _unique_specialties(names):
+    seen = {}
+    for name in names:
+        slug = ProfessionalSpecialty.slugify(name)
+        if slug and slug not in seen:
+            seen[slug] = name
+    return list(seen.items())
+
+
+def _insert_reviews(rows, extras):
+    ids = db.session.scalars(insert(Review).returning(Review.id, sort_by_parameter_order=True), rows).all()
+    ChangeLog.record('reviews', ids, 'insert')
+    star_deltas = {}
+    for row in rows:
+        deltas = star_deltas.setdefault(row['professional_id'], {})
+        deltas[row['rating']] = deltas.get(row['rating'], 0) + 1
+    Professional.apply_star_deltas(star_deltas)
+    tags = ['reviews', 'professionals']
+    for professional_id in star_deltas:
+        tags += [f'reviews:{professional_id}', f'professional:{professional_id}']
+    return tags
+
+
+def _insert_service_requests(rows, extras):
+    ids = db.session.scalars(
+        insert(ServiceRequest).returning(ServiceRequest.id, sort_by_parameter_order=True), rows
+    ).all()
+    ChangeLog.record('service_requests', ids, 'insert')
+    # Los turnos importados no se validan contra la agenda (son datos históricos)
+    return ['service_requests'] + [f'availability:{pid}' for pid in {row['professional_id'] for row in rows}]
+
+
+# recurso -> (modelo, constructor de filas, inserción por lote, opciones de exportación)
+RESOURCES = {
+    'professionals': (Professional, _professional_row, _insert_professionals,
+                      lambda: [Professional.with_specialties()]),
+    'reviews': (Review, _review_row, _insert_reviews, lambda: []),
+    'service-requests': (ServiceRequest, _service_request_row, _insert_service_requests,
+                         lambda: [ServiceRequest.with_professional()]),
+}
+
+
+def _missing_professionals(rows):
+    """Ids de profesional referenciados por el lote que no existen (una sola consulta IN)"""
+    wanted = {row['professional_id'] for row in rows}
+    found = set(db.session.scalars(db.select(Professional.id).where(Professional.id.in_(wanted))))
+    return wanted - found
+
+
+def import_ndjson(resource, lines, batch_size=BATCH_SIZE):
+    """Importa un flujo de líneas NDJSON en transacciones por lotes.
+
+    Las líneas inválidas se informan con su número y no impiden importar el
+    resto. Devuelve el resumen (insertados y errores) y las etiquetas de caché
+    que hay que invalidar.
+    """
+    model, build_row, insert_rows, _ = RESOURCES[resource]
+    summary = {'inserted': 0, 'error_count': 0, 'errors': []}
+    tags = set()
+
+    def report(line_number, message):
+        summary['error_count'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': line_number, 'error': message})
+
+    def flush(batch):
+        if model is not Professional:
+            missing = _missing_professionals([row for _, row, _ in batch])
+            for line_number, row, _ in batch:
+                if row['professional_id'] in missing:
+                    report(line_number, f"Professional {row['professional_id']} not found")
+            batch = [item for item in batch if item[1]['professional_id'] not in missing]
+        if not batch:
+            return
+        try:
+            batch_tags = insert_rows([row for _, row, _ in batch], [extra for _, _, extra in batch])
+            db.session.commit()
+            tags.update(batch_tags)
+            summary['inserted'] += len(batch)
+        except Exception as e:
+            db.session.rollback()
+            for line_number, _, _ in batch:
+                report(line_number, f'Batch failed: {e.__class__.__name__}')
+
+    loads = current_app.json.loads
+    batch = []
+    for line_number, raw in enumerate(lines, start=1):
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        if not raw.strip():
+            continue
+        try:
+            data = loads(raw)
+            if not isinstance(data, dict):
+                raise ValueError('Expected a JSON object')
+            row, extra = build_row(data)
+        except KeyError as e:
+            report(line_number, f'Missing field {e.args[0]}')
+            continue
+        except (ValueError, TypeError) as e:
+            report(line_number, str(e))
+            continue
+        batch.append((line_number, row, extra))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    flush(batch)
+    return summary, tags
+
+
+def export_ndjson(resource, batch_size=BATCH_SIZE):
+    """Genera una línea NDJSON por fila, leyendo con un cursor del lado del servidor"""
+    model, _, _, options = RESOURCES[resource]
+    query = model.query.options(*options()).order_by(model.id).yield_per(batch_size)
+    dumps = current_app.json.dumps
+    for item in query:
+        yield dumps(item.to_dict()) + '\n'
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+
+
+class MemoryBackend:
+    """LRU en memoria con TTL; sólo ve las invalidaciones de su propio proceso"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, tags):
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class SQLiteBackend:
+    """Caché en un archivo SQLite compartido por todos los workers de la máquina"""
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS response_cache '
+            '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS response_cache_version '
+            '(tag TEXT PRIMARY KEY, version INTEGER NOT NULL)'
+        )
+
+    def _connection(self):
+        # Una conexión por hilo; tras un fork (gunicorn --preload) se abre otra
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM response_cache WHERE key = ? AND expires_at >= ?', (key, time.time())
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value), time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            connection.execute('DELETE FROM response_cache WHERE expires_at < ?', (time.time(),))
+
+    def versions(self, tags):
+        placeholders = ', '.join('?' * len(tags))
+        rows = dict(self._connection().execute(
+            f'SELECT tag, version FROM response_cache_version WHERE tag IN ({placeholders})', tags
+        ).fetchall())
+        return [rows.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        self._connection().executemany(
+            'INSERT INTO response_cache_version (tag, version) VALUES (?, 1) '
+            'ON CONFLICT(tag) DO UPDATE SET version = version + 1',
+            [(tag,) for tag in tags]
+        )
+
+    def clear(self):
+        connection = self._connection()
+        connection.execute('DELETE FROM response_cache')
+        connection.execute('DELETE FROM response_cache_version')
+
+
+def create_backend(url, max_entries=1024):
+    """Crea el backend a partir de una URL: memory:// o sqlite:///ruta/al/archivo.db
+
+    El backend en memoria es propio de cada worker de gunicorn: una escritura
+    sólo invalida la caché del worker que la atendió y en los demás la entrada
+    vence por TTL. Con sqlite:/// la invalidación es inmediata en todos.
+    """
+    if not url or url.startswith('memory://'):
+        return MemoryBackend(max_entries)
+    if url.startswith('sqlite:///'):
+        return SQLiteBackend(url[len('sqlite:///'):])
+    raise ValueError(f'Unsupported response cache backend: {url}')
+
+
+class ResponseCache:
+    """Caché de respuestas GET con ETag, invalidada por etiquetas.
+
+    Cada entrada queda asociada a las versiones de sus etiquetas en el momento
+    de guardarla; invalidar una etiqueta incrementa su versión y deja
+    inaccesibles todas las entradas anteriores sin tener que buscarlas.
+    """
+
+    CACHED_HEADERS = ('Content-Type', 'X-Next-Cursor', 'Link')
+
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+
+    def _key(self, tags):
+        versions = self.backend.versions(tags)
+        args = sorted(request.args.items(multi=True))
+        raw = repr((request.path, args, list(zip(tags, versions))))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def respond(self, tags, ttl, view, args, kwargs):
+        key = self._key(tags)
+        entry = self.backend.get(key)
+        if entry is None:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            etag = hashlib.sha1(body).hexdigest()
+            headers = [(h, response.headers[h]) for h in self.CACHED_HEADERS if h in response.headers]
+            self.backend.set(key, (body, headers, etag), ttl or self.ttl)
+            response.headers['X-Cache'] = 'MISS'
+        else:
+            body, headers, etag = entry
+            response = current_app.response_class(body, headers=headers)
+            response.headers['X-Cache'] = 'HIT'
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    def invalidate(self, *tags):
+        if tags:
+            self.backend.bump(list(tags))
+
+
+def cached(*tags, ttl=None):
+    """Cachea la respuesta de una vista GET.
+
+    Las etiquetas pueden usar los argumentos de la ruta, p. ej. 'reviews:{professional_id}'.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None:
+                return view(*args, **kwargs)
+            resolved = [tag.format(**kwargs) for tag in tags]
+            return cache.respond(resolved, ttl, view, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags):
+    """Invalida las respuestas cacheadas con alguna de las etiquetas dadas"""
+    cache = current_app.extensions.get('response_cache')
+    if cache is not None:
+        cache.invalidate(*tags)
+
+
+def init_response_cache(app):
+    app.config.setdefault('RESPONSE_CACHE_URL', os.getenv('RESPONSE_CACHE_URL', 'memory://'))
+    app.config.setdefault('RESPONSE_CACHE_TTL', int(os.getenv('RESPONSE_CACHE_TTL', '60')))
+    app.config.setdefault('RESPONSE_CACHE_MAX_ENTRIES', 1024)
+    if app.config['RESPONSE_CACHE_URL'] == 'none':
+        return
+    backend = create_backend(app.config['RESPONSE_CACHE_URL'], app.config['RESPONSE_CACHE_MAX_ENTRIES'])
+    app.extensions['response_cache'] = ResponseCache(backend, app.config['RESPONSE_CACHE_TTL'])
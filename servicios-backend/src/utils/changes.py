@@ -0,0 +1,194 @@
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event, exists, func, insert
+from sqlalchemy.orm import aliased
+
+from src.models.change_log import ChangeLog
+from src.models.professional import Professional
+from src.models.review import Review
+from src.models.service_request import ServiceRequest
+from src.models.user import db
+from src.utils.database import RoutingSession
+from src.utils.pagination import decode_cursor, encode_cursor
+
+# tipo de cambio -> (modelo, opciones de carga para serializarlo)
+CHANGE_TYPES = {
+    'professionals': (Professional, lambda: [Professional.with_specialties()]),
+    'reviews': (Review, lambda: []),
+    'service_requests': (ServiceRequest, lambda: [ServiceRequest.with_professional()]),
+}
+_TYPE_BY_MODEL = {model: name for name, (model, _) in CHANGE_TYPES.items()}
+
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 1000
+# Las entradas reemplazadas sólo se compactan pasado este tiempo, así los
+# clientes al día todavía distinguen un alta de una edición
+SUPERSEDED_MIN_AGE = timedelta(hours=1)
+_EPOCH = datetime(1970, 1, 1)
+
+
+class CursorExpired(Exception):
+    """El cursor es anterior a la retención del log: el cliente tiene que volver a descargar todo"""
+
+
+def _before_flush(session, flush_context, instances):
+    """Sube la versión de las filas editadas y anota qué hay que registrar después del flush"""
+    now = datetime.utcnow()
+    pending = session.info.setdefault('pending_changes', [])
+    for obj in session.new:
+        if type(obj) in _TYPE_BY_MODEL:
+            pending.append((obj, 'insert'))
+    for obj in session.dirty:
+        model = type(obj)
+        if model in _TYPE_BY_MODEL and session.is_modified(obj):
+            # Incremento en SQL: dos transacciones concurrentes no repiten la versión
+            obj.version = model.version + 1
+            obj.updated_at = now
+            pending.append((obj, 'update'))
+    for obj in session.deleted:
+        if type(obj) in _TYPE_BY_MODEL:
+            pending.append((obj, 'delete'))
+
+
+def _after_flush(session, flush_context):
+    # Los ids de las altas recién existen ahora; se escribe por la conexión para no re-entrar al flush
+    pending = session.info.pop('pending_changes', None)
+    if not pending:
+        return
+    now = datetime.utcnow()
+    rows = [
+        {'entity_type': _TYPE_BY_MODEL[type(obj)], 'entity_id': obj.id, 'operation': operation, 'changed_at': now}
+        for obj, operation in pending
+    ]
+    session.connection().execute(insert(ChangeLog.__table__), rows)
+
+
+def _discard_pending(session, *args):
+    session.info.pop('pending_changes', None)
+
+
+def _cursor(last_id, as_of):
+    return encode_cursor([last_id, int((as_of - _EPOCH).total_seconds())])
+
+
+def start_cursor():
+    """Cursor vigente que pide el log desde la primera entrada"""
+    return _cursor(0, datetime.utcnow())
+
+
+def parse_types(value):
+    """Tipos pedidos con ?types= (separados por comas); todos si no se indica"""
+    if not value:
+        return list(CHANGE_TYPES)
+    types = [t.strip() for t in value.split(',') if t.strip()]
+    unknown = [t for t in types if t not in CHANGE_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown types: {', '.join(unknown)}")
+    return types
+
+
+def changes_since(cursor, types, limit):
+    """Cambios posteriores al cursor, uno por fila (el último), y el cursor siguiente.
+
+    Sin cursor devuelve sólo la posición actual del log. El cursor no avanza
+    sobre entradas de los últimos CHANGES_SETTLE_SECONDS: una transacción más
+    lenta todavía puede confirmar una entrada con un id menor. Esas entradas se
+    devuelven igual y vuelven a llegar en la consulta siguiente.
+    """
+    config = current_app.config
+    now = datetime.utcnow()
+    settle = timedelta(seconds=config['CHANGES_SETTLE_SECONDS'])
+    settled = now - settle
+    if cursor is None:
+        # Las dos consultas leen pocas entradas del índice: las no asentadas y la última
+        unsettled = db.session.scalar(db.select(func.min(ChangeLog.id)).where(ChangeLog.changed_at > settled))
+        if unsettled is not None:
+            last_id = unsettled - 1
+        else:
+            last_id = db.session.scalar(db.select(func.max(ChangeLog.id))) or 0
+        return {'changes': [], 'cursor': _cursor(last_id, settled), 'has_more': False}
+
+    last_id, as_of = decode_cursor(cursor, 2)
+    if not isinstance(last_id, int) or not isinstance(as_of, int):
+        raise ValueError('Invalid cursor')
+    as_of = _EPOCH + timedelta(seconds=as_of)
+    # La compactación borra por changed_at; el margen cubre entradas confirmadas tarde
+    if as_of < now - timedelta(days=config['CHANGE_LOG_RETENTION_DAYS']) + settle:
+        raise CursorExpired()
+
+    query = db.select(ChangeLog).where(ChangeLog.id > last_id)
+    if len(types) < len(CHANGE_TYPES):
+        query = query.where(ChangeLog.entity_type.in_(types))
+    entries = db.session.scalars(query.order_by(ChangeLog.id).limit(limit + 1)).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    next_id, next_as_of = last_id, as_of
+    for entry in entries:
+        if entry.changed_at > settled:
+            has_more = False
+            break
+        next_id, next_as_of = entry.id, entry.changed_at
+    else:
+        if not has_more:
+            next_as_of = settled
+
+    # Una fila cambiada varias veces se informa una vez, en la posición de su último cambio
+    latest = {}
+    for entry in entries:
+        key = (entry.entity_type, entry.entity_id)
+        inserted = key in latest and latest.pop(key)[1]
+        latest[key] = (entry, inserted or entry.operation == 'insert')
+
+    ids_by_type = {}
+    for entity_type, entity_id in latest:
+        ids_by_type.setdefault(entity_type, set()).add(entity_id)
+    rows = {}
+    for entity_type, ids in ids_by_type.items():
+        model, options = CHANGE_TYPES[entity_type]
+        query = model.query.options(*options()).filter(model.id.in_(ids))
+        rows[entity_type] = {row.id: row for row in query}
+
+    changes = []
+    for (entity_type, entity_id), (entry, inserted) in latest.items():
+        row = rows[entity_type].get(entity_id)
+        if row is None:
+            changes.append({'type': entity_type, 'id': entity_id, 'op': 'delete'})
+        else:
+            changes.append({'type': entity_type, 'id': entity_id, 'op': 'insert' if inserted else 'update',
+                            'data': row.to_dict()})
+    return {'changes': changes, 'cursor': _cursor(next_id, next_as_of), 'has_more': has_more}
+
+
+def compact_change_log(retention_days):
+    """Borra las entradas vencidas y las reemplazadas por un cambio posterior de la misma fila.
+
+    Devuelve (vencidas, reemplazadas).
+    """
+    now = datetime.utcnow()
+    expired = ChangeLog.query.filter(
+        ChangeLog.changed_at < now - timedelta(days=retention_days)
+    ).delete(synchronize_session=False)
+    newer = aliased(ChangeLog)
+    superseded = ChangeLog.query.filter(
+        ChangeLog.changed_at < now - SUPERSEDED_MIN_AGE,
+        exists().where(
+            newer.entity_type == ChangeLog.entity_type,
+            newer.entity_id == ChangeLog.entity_id,
+            newer.id > ChangeLog.id
+        )
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return expired, superseded
+
+
+def init_change_log(app):
+    """Versiona las filas y registra cada alta, edición y baja hecha con el ORM"""
+    app.config.setdefault('CHANGE_LOG_RETENTION_DAYS', int(os.getenv('CHANGE_LOG_RETENTION_DAYS', '14')))
+    app.config.setdefault('CHANGES_SETTLE_SECONDS', int(os.getenv('CHANGES_SETTLE_SECONDS', '5')))
+    if not event.contains(RoutingSession, 'before_flush', _before_flush):
+        event.listen(RoutingSession, 'before_flush', _before_flush)
+        event.listen(RoutingSession, 'after_flush', _after_flush)
+        event.listen(RoutingSession, 'after_rollback', _discard_pending)
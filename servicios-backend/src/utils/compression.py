@@ -0,0 +1,66 @@
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # sin brotli sólo se comprime con gzip
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/html', 'text/plain',
+                          'text/css', 'application/javascript', 'text/javascript')
+
+
+def _negotiate():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality('br') > 0:
+        return 'br'
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def _compressible(response, min_size):
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and 'Content-Encoding' not in response.headers
+        and not response.cache_control.no_transform
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and (response.content_length or 0) >= min_size
+    )
+
+
+def init_compression(app):
+    """Comprime con brotli o gzip, según Accept-Encoding, las respuestas de más de COMPRESS_MIN_SIZE bytes.
+
+    Las respuestas en streaming y los archivos (que ya tienen variantes
+    precomprimidas, ver static_assets.py) se envían tal cual.
+    """
+    app.config.setdefault('COMPRESS_MIN_SIZE', int(os.getenv('COMPRESS_MIN_SIZE', '1024')))
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', int(os.getenv('COMPRESS_GZIP_LEVEL', '6')))
+    app.config.setdefault('COMPRESS_BROTLI_QUALITY', int(os.getenv('COMPRESS_BROTLI_QUALITY', '4')))
+
+    @app.after_request
+    def compress_response(response):
+        if request.method == 'HEAD' or not _compressible(response, app.config['COMPRESS_MIN_SIZE']):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = _negotiate()
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if encoding == 'br':
+            data = brotli.compress(data, quality=app.config['COMPRESS_BROTLI_QUALITY'])
+        else:
+            data = gzip.compress(data, compresslevel=app.config['COMPRESS_GZIP_LEVEL'])
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        # El cuerpo ya no es byte a byte el mismo: el ETag pasa a ser débil, y
+        # un If-None-Match con él sigue dando 304 (la comparación es débil)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
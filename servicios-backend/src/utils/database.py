@@ -0,0 +1,115 @@
+import os
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from src.utils.asgi import async_database_uri
+
+REPLICA_BIND = 'replica'
+READ_METHODS = ('GET', 'HEAD')
+
+# Pragmas aplicados a cada conexión SQLite nueva. WAL permite que las
+# lecturas de un worker no esperen a la escritura de otro.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',   # seguro con WAL; sólo el último commit puede perderse ante un corte de luz
+    'cache_size': -20000,      # ~20 MB de caché de páginas por conexión
+    'temp_store': 'MEMORY',
+    'mmap_size': 268435456,    # 256 MB
+}
+
+
+class RoutingSession(Session):
+    """Sesión que manda las lecturas de los requests GET/HEAD a la réplica.
+
+    Los flush (escrituras) y todo lo que ocurra fuera de un request (CLI,
+    worker del outbox, migraciones) siguen usando la base principal.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get('use_replica'):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_primary(view):
+    """Marca una vista GET que debe leer de la base principal (por ejemplo, justo después de escribir)"""
+    view.use_primary = True
+    return view
+
+
+def _is_memory_sqlite(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def _engine_options(app, url):
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_recycle': app.config['DB_POOL_RECYCLE'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        'pool_pre_ping': True,
+    }
+
+
+def _sqlite_pragma_listener(pragmas, busy_timeout_ms):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+    return set_pragmas
+
+
+def init_database(app, db):
+    """Configura pool, pragmas de SQLite y réplica de lectura y registra `db` en la app.
+
+    Reemplaza a `db.init_app(app)`: las opciones del engine tienen que estar en
+    la configuración antes de que Flask-SQLAlchemy cree los engines.
+    """
+    app.config.setdefault('DB_POOL_SIZE', int(os.getenv('DB_POOL_SIZE', '5')))
+    app.config.setdefault('DB_MAX_OVERFLOW', int(os.getenv('DB_MAX_OVERFLOW', '10')))
+    app.config.setdefault('DB_POOL_RECYCLE', int(os.getenv('DB_POOL_RECYCLE', '1800')))
+    app.config.setdefault('DB_POOL_TIMEOUT', int(os.getenv('DB_POOL_TIMEOUT', '10')))
+    app.config.setdefault('DB_BUSY_TIMEOUT_MS', int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000')))
+    app.config.setdefault('SQLITE_PRAGMAS', dict(SQLITE_PRAGMAS))
+    app.config.setdefault('DATABASE_REPLICA_URI', os.getenv('DATABASE_REPLICA_URI'))
+    app.config.setdefault('ASYNC_MODE', False)
+
+    if app.config['ASYNC_MODE']:
+        # Servida por ASGI (src/asgi.py): las consultas esperan a la base en el event loop
+        app.config['SQLALCHEMY_DATABASE_URI'] = async_database_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+        if app.config['DATABASE_REPLICA_URI']:
+            app.config['DATABASE_REPLICA_URI'] = async_database_uri(app.config['DATABASE_REPLICA_URI'])
+
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS',
+                          _engine_options(app, app.config['SQLALCHEMY_DATABASE_URI']))
+    replica_uri = app.config['DATABASE_REPLICA_URI']
+    if replica_uri:
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault(REPLICA_BIND, {'url': replica_uri, **_engine_options(app, replica_uri)})
+
+    db.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                listener = _sqlite_pragma_listener(app.config['SQLITE_PRAGMAS'],
+                                                   app.config['DB_BUSY_TIMEOUT_MS'])
+                event.listen(engine, 'connect', listener)
+
+    if replica_uri:
+        @app.before_request
+        def route_reads_to_replica():
+            view = app.view_functions.get(request.endpoint)
+            g.use_replica = request.method in READ_METHODS and not getattr(view, 'use_primary', False)
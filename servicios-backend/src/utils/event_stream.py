@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from src.models.outbox import OutboxEvent
+from src.utils.database import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+# Eventos recientes que cada proceso guarda en memoria para los streams abiertos
+BUFFER_SIZE = 1000
+# Eventos que el broker SQLite conserva para reanudar con Last-Event-ID
+REPLAY_RETENTION_SECONDS = 3600
+# Cada cuánto el hilo de cada worker lee los eventos publicados por los demás
+POLL_INTERVAL_SECONDS = 0.2
+# Espera sugerida al navegador antes de reconectar (campo retry de SSE)
+RECONNECT_MS = 3000
+
+Event = namedtuple('Event', 'id channel type data')
+
+
+class BrokerReset(Exception):
+    """El broker ya no tiene los eventos posteriores al Last-Event-ID del cliente"""
+
+
+class _Hub:
+    """Últimos eventos vistos por el proceso; los streams esperan aquí el siguiente"""
+
+    def __init__(self, last_id=0):
+        self.last_id = last_id
+        self._events = deque(maxlen=BUFFER_SIZE)
+        self._condition = threading.Condition()
+        self._waiters = set()  # (loop, future) de los streams que esperan en modo ASGI
+
+    def put(self, events):
+        if not events:
+            return
+        with self._condition:
+            self._events.extend(events)
+            self.last_id = events[-1].id
+            self._condition.notify_all()
+            for loop, future in self._waiters:
+                loop.call_soon_threadsafe(_wake, future)
+
+    def _after(self, position, channels):
+        found = []
+        for item in reversed(self._events):
+            if item.id <= position:
+                break
+            if item.channel in channels:
+                found.append(item)
+        found.reverse()
+        return found
+
+    def replay(self, channels, after_id):
+        """(eventos posteriores a after_id, posición); BrokerReset si el buffer ya no los tiene"""
+        with self._condition:
+            oldest = self._events[0].id if self._events else self.last_id + 1
+            if after_id > self.last_id or after_id < oldest - 1:
+                raise BrokerReset()
+            return self._after(after_id, channels), self.last_id
+
+    def wait(self, channels, position, timeout):
+        """Bloquea hasta `timeout` segundos; devuelve (eventos nuevos de esos canales, posición)"""
+        if in_greenlet():
+            # Modo ASGI: el stream espera en el event loop sin ocupar un hilo
+            return await_only(self._wait_async(channels, position, timeout))
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                found = self._after(position, channels)
+                # El replay de SQLiteBroker lee el máximo de la base, que puede ir
+                # adelante del hilo lector: la posición nunca retrocede
+                position = max(position, self.last_id)
+                remaining = deadline - time.monotonic()
+                if found or remaining <= 0:
+                    return found, position
+                self._condition.wait(remaining)
+
+    async def _wait_async(self, channels, position, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            with self._condition:
+                found = self._after(position, channels)
+                position = max(position, self.last_id)
+                remaining = deadline - loop.time()
+                if found or remaining <= 0:
+                    return found, position
+                waiter = (loop, loop.create_future())
+                self._waiters.add(waiter)
+            try:
+                await asyncio.wait_for(waiter[1], remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._condition:
+                    self._waiters.discard(waiter)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class MemoryBroker:
+    """Broker dentro del proceso: sólo ven los eventos los streams del mismo worker"""
+
+    def __init__(self):
+        self._hub = _Hub()
+        self._lock = threading.Lock()
+
+    def publish(self, messages):
+        with self._lock:
+            first = self._hub.last_id + 1
+            self._hub.put([Event(first + i, *message) for i, message in enumerate(messages)])
+
+    def head(self):
+        return self._hub.last_id
+
+    def replay(self, channels, after_id):
+        return self._hub.replay(channels, after_id)
+
+    def wait(self, channels, position, timeout):
+        return self._hub.wait(channels, position, timeout)
+
+
+class SQLiteBroker:
+    """Broker en un archivo SQLite compartido por todos los workers de la máquina.
+
+    Hace de reemplazo local de un pub/sub: publicar es un INSERT y, en cada
+    worker, un hilo lee las filas nuevas y las reparte a sus streams. Los ids
+    AUTOINCREMENT no se reutilizan, así que sirven de Last-Event-ID.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._hub = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # Una conexión por hilo; tras un fork (gunicorn --preload) se abre otra
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            # Por conexión y no una sola vez: el archivo puede haberse borrado desde el arranque
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS stream_event (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'channel TEXT NOT NULL, type TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_stream_event_channel ON stream_event (channel, id)')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _last_id(self):
+        return self._connection().execute('SELECT coalesce(max(id), 0) FROM stream_event').fetchone()[0]
+
+    def _subscribe(self):
+        """Hub del proceso; el hilo lector se arranca en cada worker al abrir el primer stream"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._hub = _Hub(self._last_id())
+                self._pid = os.getpid()
+                threading.Thread(target=self._poll, args=(self._hub,), name='event-broker', daemon=True).start()
+            return self._hub
+
+    def _poll(self, hub):
+        while True:
+            try:
+                rows = self._connection().execute(
+                    'SELECT id, channel, type, data FROM stream_event WHERE id > ? ORDER BY id LIMIT 1000',
+                    (hub.last_id,)
+                ).fetchall()
+            except sqlite3.Error:
+                logger.exception('event broker: no se pudieron leer los eventos')
+                rows = []
+            hub.put([Event(*row) for row in rows])
+            if len(rows) < 1000:
+                time.sleep(POLL_INTERVAL_SECONDS)
+
+    def publish(self, messages):
+        connection = self._connection()
+        now = time.time()
+        connection.executemany(
+            'INSERT INTO stream_event (channel, type, data, created_at) VALUES (?, ?, ?, ?)',
+            [(channel, event_type, data, now) for channel, event_type, data in messages]
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            connection.execute('DELETE FROM stream_event WHERE created_at < ?', (now - REPLAY_RETENTION_SECONDS,))
+
+    def head(self):
+        return self._subscribe().last_id
+
+    def replay(self, channels, after_id):
+        self._subscribe()
+        connection = self._connection()
+        # Una lectura: la base tiene todo lo posterior al buffer del proceso
+        connection.execute('BEGIN')
+        try:
+            oldest, last_id = connection.execute('SELECT min(id), coalesce(max(id), 0) FROM stream_event').fetchone()
+            if after_id > last_id or (oldest is not None and after_id < oldest - 1):
+                raise BrokerReset()
+            placeholders = ', '.join('?' * len(channels))
+            rows = connection.execute(
+                f'SELECT id, channel, type, data FROM stream_event WHERE channel IN ({placeholders}) '
+                'AND id > ? ORDER BY id', [*channels, after_id]
+            ).fetchall()
+        finally:
+            connection.execute('COMMIT')
+        # Lo que el hilo lector traiga hasta last_id ya salió en el replay
+        return [Event(*row) for row in rows], last_id
+
+    def wait(self, channels, position, timeout):
+        return self._subscribe().wait(channels, position, timeout)
+
+
+def create_broker(url):
+    """memory:// (cada worker por separado) o sqlite:///ruta/al/archivo.db (todos los workers)"""
+    if not url or url.startswith('memory://'):
+        return MemoryBroker()
+    if url.startswith('sqlite:///'):
+        return SQLiteBroker(url[len('sqlite:///'):])
+    raise ValueError(f'Unsupported event broker: {url}')
+
+
+def _channels_for(outbox_event):
+    payload = current_app.json.loads(outbox_event.payload)
+    return (f"professional:{payload['professional_id']}", f'service_request:{outbox_event.aggregate_id}')
+
+
+def _collect_events(session, flush_context):
+    # Los eventos del outbox ya tienen id; se publican recién cuando el commit se confirma
+    pending = session.info.setdefault('stream_events', [])
+    for obj in session.new:
+        if isinstance(obj, OutboxEvent):
+            pending.extend((channel, obj.event_type, obj.payload) for channel in _channels_for(obj))
+
+
+def _publish_events(session):
+    pending = session.info.pop('stream_events', None)
+    if not pending:
+        return
+    broker = current_app.extensions.get('event_broker')
+    if broker is None:
+        return
+    try:
+        broker.publish(pending)
+    except Exception:
+        # El cambio ya está confirmado: los streams lo pierden, /api/changes no
+        logger.exception('event broker: no se pudieron publicar %s eventos', len(pending))
+
+
+def _discard_events(session, *args):
+    session.info.pop('stream_events', None)
+
+
+def _format(item):
+    return f'id: {item.id}\nevent: {item.type}\ndata: {item.data}\n\n'
+
+
+def event_stream(channels, last_event_id=None, timeout=None):
+    """Respuesta text/event-stream con los eventos de los canales dados.
+
+    Con `last_event_id` primero reenvía lo publicado después; si el broker ya
+    no lo tiene envía un evento `reset` y el cliente debe recargar sus datos.
+    Mientras no haya eventos envía un comentario cada SSE_HEARTBEAT_SECONDS.
+    El stream se cierra a los `timeout` segundos (como mucho
+    SSE_MAX_STREAM_SECONDS) y el cliente reconecta con Last-Event-ID.
+    El generador no usa la sesión de la base: la conexión vuelve al pool al
+    terminar la vista.
+    """
+    config = current_app.config
+    broker = current_app.extensions['event_broker']
+    heartbeat = config['SSE_HEARTBEAT_SECONDS']
+    max_seconds = config['SSE_MAX_STREAM_SECONDS']
+    duration = max_seconds if timeout is None else max(0, min(timeout, max_seconds))
+    channels = frozenset(channels)
+
+    def generate():
+        deadline = time.monotonic() + duration
+        yield f'retry: {RECONNECT_MS}\n\n'
+        if last_event_id is None:
+            position = broker.head()
+        else:
+            try:
+                missed, position = broker.replay(channels, last_event_id)
+            except BrokerReset:
+                position = broker.head()
+                yield f'id: {position}\nevent: reset\ndata: {{}}\n\n'
+            else:
+                for item in missed:
+                    yield _format(item)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            found, position = broker.wait(channels, position, min(heartbeat, remaining))
+            if found:
+                yield ''.join(_format(item) for item in found)
+            elif remaining > heartbeat:
+                yield ': heartbeat\n\n'
+
+    response = current_app.response_class(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx y proxies similares no deben acumularlo
+    return response
+
+
+def parse_last_event_id(value):
+    """Last-Event-ID como entero; None si falta o no es válido (el stream empieza desde ahora)"""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def init_event_stream(app):
+    """Publica los eventos de solicitudes de servicio, después del commit, en el broker de los streams SSE"""
+    app.config.setdefault('EVENT_BROKER_URL', os.getenv('EVENT_BROKER_URL', 'memory://'))
+    app.config.setdefault('SSE_HEARTBEAT_SECONDS', float(os.getenv('SSE_HEARTBEAT_SECONDS', '15')))
+    app.config.setdefault('SSE_MAX_STREAM_SECONDS', float(os.getenv('SSE_MAX_STREAM_SECONDS', '300')))
+    app.extensions['event_broker'] = create_broker(app.config['EVENT_BROKER_URL'])
+    if not event.contains(RoutingSession, 'after_flush', _collect_events):
+        event.listen(RoutingSession, 'after_flush', _collect_events)
+        event.listen(RoutingSession, 'after_commit', _publish_events)
+        event.listen(RoutingSession, 'after_rollback', _discard_events)
@@ -0,0 +1,56 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+# Tamaño de celda de la grilla en grados (~5.5 km de lado en latitud)
+CELL_DEGREES = 0.05
+LON_CELLS = int(round(360 / CELL_DEGREES))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distancia de círculo máximo entre dos puntos, en kilómetros"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cell_index(lat, lon):
+    i = int(math.floor((min(lat, 89.999999) + 90) / CELL_DEGREES))
+    j = int(math.floor((lon + 180) / CELL_DEGREES)) % LON_CELLS
+    return i, j
+
+
+def grid_cell(lat, lon):
+    """Clave de la celda de grilla que contiene el punto"""
+    i, j = _cell_index(lat, lon)
+    return f'{i}:{j}'
+
+
+def cells_within(lat, lon, radius_km):
+    """Claves de todas las celdas que intersectan el círculo de radio dado"""
+    lat_span = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    lon_span = 180.0 if cos_lat < 1e-6 else min(180.0, lat_span / cos_lat)
+
+    i_min, _ = _cell_index(max(lat - lat_span, -90.0), lon)
+    i_max, _ = _cell_index(min(lat + lat_span, 90.0), lon)
+    _, j_center = _cell_index(lat, lon)
+    j_radius = int(math.ceil(lon_span / CELL_DEGREES))
+    if 2 * j_radius + 1 >= LON_CELLS:
+        columns = range(LON_CELLS)
+    else:
+        columns = [(j_center + dj) % LON_CELLS for dj in range(-j_radius, j_radius + 1)]
+
+    return [f'{i}:{j}' for i in range(i_min, i_max + 1) for j in columns]
+
+
+def parse_coordinates(lat, lon):
+    """Convierte y valida un par latitud/longitud; lanza ValueError si no es válido"""
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid coordinates')
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError('Invalid coordinates')
+    return lat, lon
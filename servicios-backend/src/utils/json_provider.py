@@ -0,0 +1,60 @@
+import os
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el módulo json estándar
+    orjson = None
+
+
+def _default(o):
+    # Fechas en ISO 8601, igual que orjson (Flask por defecto usa el formato HTTP)
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de la app: orjson si está instalado, json estándar si no.
+
+    Ambos serializan datetime, date y time en ISO 8601, así los `to_dict` de
+    los modelos pueden devolver esos objetos tal cual. Las claves se ordenan
+    como en el proveedor de Flask para que los ETag no cambien entre workers.
+    """
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def __init__(self, app, use_orjson=True):
+        super().__init__(app)
+        self.use_orjson = use_orjson and orjson is not None
+        self._options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS if self.use_orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        # orjson no admite los argumentos de json.dumps: con argumentos se usa el estándar
+        if self.use_orjson and not kwargs:
+            return orjson.dumps(obj, default=_default, option=self._options).decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self._options | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        # Los bytes van directo a la respuesta, sin pasar por str
+        return self._app.response_class(orjson.dumps(obj, default=_default, option=options),
+                                        mimetype=self.mimetype)
+
+
+def init_json(app):
+    app.config.setdefault('JSON_PROVIDER', os.getenv('JSON_PROVIDER', 'orjson'))
+    app.json = FastJSONProvider(app, use_orjson=app.config['JSON_PROVIDER'] == 'orjson')
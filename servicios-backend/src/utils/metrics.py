@@ -0,0 +1,223 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# nombre -> (tipo, ayuda, buckets)
+METRICS = {
+    'http_requests_total': ('counter', 'Requests atendidos', None),
+    'http_request_duration_seconds': ('histogram', 'Duración de los requests', LATENCY_BUCKETS),
+    'db_queries_per_request': ('histogram', 'Sentencias SQL emitidas por request', QUERY_COUNT_BUCKETS),
+    'db_time_seconds_per_request': ('histogram', 'Tiempo en la base de datos por request', LATENCY_BUCKETS),
+    'db_slow_queries_total': ('counter', 'Sentencias SQL más lentas que SLOW_QUERY_MS', None),
+}
+
+
+class MetricsRegistry:
+    """Contadores e histogramas del worker, con volcado a un archivo para agregarlos.
+
+    Cada worker de gunicorn escribe su estado en `directory/worker-<pid>.json`
+    cada `flush_interval` segundos desde un hilo propio; /metrics suma los
+    archivos de todos. Los de workers ya terminados se conservan, así los
+    contadores nunca bajan mientras el servidor siga arriba.
+    """
+
+    def __init__(self, directory=None, flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._values = {name: {} for name in METRICS}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher_pid = None
+
+    def inc(self, name, labels, amount=1):
+        key = json.dumps(labels, sort_keys=True)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + amount
+            self._dirty = True
+        self._ensure_flusher()
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = json.dumps(labels, sort_keys=True)
+        with self._lock:
+            series = self._values[name]
+            data = series.get(key)
+            if data is None:
+                # un contador por bucket (el último es +Inf), suma y total
+                data = series[key] = {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+            data['buckets'][bisect_left(buckets, value)] += 1
+            data['sum'] += value
+            data['count'] += 1
+            self._dirty = True
+        self._ensure_flusher()
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self._values))
+
+    def _ensure_flusher(self):
+        # El hilo se crea en el propio worker: los hilos no sobreviven al fork
+        if not self.directory or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                try:
+                    self.flush()
+                except OSError:
+                    logger.exception('could not write metrics to %s', self.directory)
+
+    def flush(self):
+        if not self.directory:
+            return
+        self._dirty = False
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'worker-{os.getpid()}.json')
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def collect(self):
+        """Estado agregado de todos los workers (o sólo el propio si no hay directorio)"""
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+        merged = {name: {} for name in METRICS}
+        for path in glob.glob(os.path.join(self.directory, 'worker-*.json')):
+            try:
+                with open(path) as f:
+                    values = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, series in values.items():
+                if name not in merged:
+                    continue
+                for key, data in series.items():
+                    current = merged[name].get(key)
+                    if isinstance(data, dict):
+                        if current is None:
+                            merged[name][key] = data
+                        else:
+                            current['buckets'] = [a + b for a, b in zip(current['buckets'], data['buckets'])]
+                            current['sum'] += data['sum']
+                            current['count'] += data['count']
+                    else:
+                        merged[name][key] = (current or 0) + data
+        return merged
+
+
+def _format_labels(labels):
+    return ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+
+
+def render_prometheus(values):
+    """Formato de texto de Prometheus (versión 0.0.4)"""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for key, data in sorted(values.get(name, {}).items()):
+            labels = json.loads(key)
+            if kind == 'counter':
+                lines.append(f'{name}{{{_format_labels(labels)}}} {data}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), data['buckets']):
+                cumulative += count
+                le = _format_labels({**labels, 'le': bound})
+                lines.append(f'{name}_bucket{{{le}}} {cumulative}')
+            lines.append(f'{name}_sum{{{_format_labels(labels)}}} {data["sum"]}')
+            lines.append(f'{name}_count{{{_format_labels(labels)}}} {data["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Una conexión ejecuta una sentencia a la vez, así que alcanza con un solo valor
+    conn.info['query_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop('query_start', time.perf_counter())
+    if not has_request_context():
+        return
+    g.sql_time = g.get('sql_time', 0.0) + elapsed
+    threshold = current_app.config['SLOW_QUERY_MS']
+    if threshold and elapsed * 1000 >= threshold:
+        g.slow_queries = g.get('slow_queries', 0) + 1
+        params = '[executemany]' if executemany else repr(parameters)[:200]
+        logger.warning('slow query (%.1f ms) in %s: %s %s', elapsed * 1000, request.endpoint,
+                       ' '.join(statement.split()), params)
+
+
+def init_metrics(app):
+    """Mide cada request (latencia, sentencias SQL y tiempo en la base) y publica GET /metrics.
+
+    El conteo de sentencias lo lleva init_query_budget (g.sql_statements).
+    """
+    app.config.setdefault('METRICS_DIR', os.getenv('METRICS_DIR'))
+    app.config.setdefault('METRICS_FLUSH_INTERVAL', float(os.getenv('METRICS_FLUSH_INTERVAL', '5')))
+    app.config.setdefault('METRICS_TOKEN', os.getenv('METRICS_TOKEN'))
+    app.config.setdefault('SLOW_QUERY_MS', float(os.getenv('SLOW_QUERY_MS', '200')))
+    registry = MetricsRegistry(app.config['METRICS_DIR'], app.config['METRICS_FLUSH_INTERVAL'])
+    app.extensions['metrics'] = registry
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.sql_time = 0.0
+        g.slow_queries = 0
+
+    @app.teardown_request
+    def record_request(exc):
+        started = g.pop('request_started', None)
+        if started is None:
+            return
+        # Las rutas inexistentes se agrupan para no crear una serie por URL
+        endpoint = request.endpoint or 'unmatched'
+        status = '500' if exc is not None else str(g.get('response_status', 500))
+        labels = {'endpoint': endpoint, 'method': request.method}
+        registry.inc('http_requests_total', {**labels, 'status': status})
+        registry.observe('http_request_duration_seconds', labels, time.perf_counter() - started)
+        registry.observe('db_queries_per_request', labels, g.get('sql_statements', 0))
+        registry.observe('db_time_seconds_per_request', labels, g.get('sql_time', 0.0))
+        if g.get('slow_queries'):
+            registry.inc('db_slow_queries_total', labels, g.slow_queries)
+
+    @app.after_request
+    def remember_status(response):
+        g.response_status = response.status_code
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        token = current_app.config['METRICS_TOKEN']
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(render_prometheus(registry.collect()),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,86 @@
+import importlib
+import os
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+
+
+def discover_migrations():
+    """Migraciones de src/migrations ordenadas por versión ("0001_baseline" -> "0001")"""
+    migrations = []
+    for module_info in pkgutil.iter_modules([MIGRATIONS_DIR]):
+        version = module_info.name.split('_', 1)[0]
+        if version.isdigit():
+            module = importlib.import_module(f'src.migrations.{module_info.name}')
+            migrations.append((version, module_info.name, module))
+    return sorted(migrations, key=lambda m: m[0])
+
+
+def _ensure_version_table(connection):
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations '
+        '(version VARCHAR(16) PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at TIMESTAMP NOT NULL)'
+    ))
+
+
+def applied_versions(engine):
+    with engine.begin() as connection:
+        _ensure_version_table(connection)
+        return {row[0] for row in connection.execute(text('SELECT version FROM schema_migrations'))}
+
+
+def upgrade(engine):
+    """Aplica, cada una en su propia transacción, las migraciones pendientes"""
+    done = applied_versions(engine)
+    applied = []
+    for version, name, module in discover_migrations():
+        if version in done:
+            continue
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(
+                text('INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)'),
+                {'v': version, 'n': name, 't': datetime.utcnow()}
+            )
+        applied.append(name)
+    return applied
+
+
+def pending_migrations(engine):
+    done = applied_versions(engine)
+    return [name for version, name, _ in discover_migrations() if version not in done]
+
+
+# Ayudantes para escribir migraciones idempotentes
+
+def has_column(connection, table_name, column_name):
+    return any(c['name'] == column_name for c in inspect(connection).get_columns(table_name))
+
+
+def _quote(connection, name):
+    # Nombres como "user" son palabras reservadas en PostgreSQL
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def add_column(connection, table_name, column):
+    """ALTER TABLE ... ADD COLUMN si la columna todavía no existe"""
+    if has_column(connection, table_name, column.name):
+        return
+    # CreateColumn ya cita el nombre de la columna si hace falta
+    ddl = CreateColumn(column).compile(dialect=connection.dialect)
+    connection.execute(text(f'ALTER TABLE {_quote(connection, table_name)} ADD COLUMN {ddl}'))
+
+
+def drop_column(connection, table_name, column_name):
+    if has_column(connection, table_name, column_name):
+        connection.execute(text(
+            f'ALTER TABLE {_quote(connection, table_name)} DROP COLUMN {_quote(connection, column_name)}'
+        ))
+
+
+def create_index(connection, index):
+    index.create(connection, checkfirst=True)
@@ -0,0 +1,195 @@
+import importlib
+import logging
+import os
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update
+
+from src.models.user import db
+from src.models.outbox import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Espera máxima entre reintentos de un mismo evento
+MAX_BACKOFF_SECONDS = 300
+# Cada cuánto el worker borra los eventos ya entregados
+PURGE_INTERVAL_SECONDS = 3600
+
+# nombre -> función(evento); se eligen con OUTBOX_HANDLERS
+HANDLERS = {}
+
+
+def delivery_handler(name):
+    """Registra una función de entrega de eventos bajo un nombre"""
+    def decorator(fn):
+        HANDLERS[name] = fn
+        return fn
+    return decorator
+
+
+@delivery_handler('log')
+def log_handler(event):
+    logger.info('outbox %s %s:%s %s', event['event_type'], event['aggregate_type'],
+                event['aggregate_id'], event['idempotency_key'])
+
+
+@delivery_handler('webhook')
+def webhook_handler(event):
+    """POST del evento a OUTBOX_WEBHOOK_URL; el receptor deduplica por Idempotency-Key"""
+    url = current_app.config['OUTBOX_WEBHOOK_URL']
+    if not url:
+        raise RuntimeError('OUTBOX_WEBHOOK_URL is not configured')
+    body = current_app.json.dumps(event).encode('utf-8')
+    req = urllib.request.Request(url, data=body, method='POST', headers={
+        'Content-Type': 'application/json',
+        'Idempotency-Key': event['idempotency_key'],
+    })
+    with urllib.request.urlopen(req, timeout=current_app.config['OUTBOX_WEBHOOK_TIMEOUT']) as response:
+        response.read()
+
+
+def resolve_handler(name):
+    """Nombre registrado o ruta "modulo:funcion" a cualquier callable"""
+    if name in HANDLERS:
+        return HANDLERS[name]
+    module_name, sep, attr = name.partition(':')
+    if not sep:
+        raise ValueError(f'Unknown outbox handler: {name}')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def record_event(event_type, service_request, **extra):
+    """Agrega el evento a la sesión actual: se guarda (o se descarta) con el mismo commit.
+
+    La solicitud ya tiene que tener id, así que en las altas hay que hacer flush antes.
+    """
+    payload = service_request.to_dict()
+    payload.update(extra)
+    event = OutboxEvent(
+        event_type=event_type,
+        aggregate_type='service_request',
+        aggregate_id=service_request.id,
+        payload=current_app.json.dumps(payload)
+    )
+    db.session.add(event)
+    return event
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(2 ** attempts, MAX_BACKOFF_SECONDS))
+
+
+def _claim(batch_size, lease_seconds):
+    """Toma un lote vencido en una transacción corta y devuelve [(id, intentos, vencimiento, evento)].
+
+    Los eventos quedan en 'processing' con available_at como vencimiento del
+    lease: si el worker muere a mitad del lote, otro los vuelve a tomar cuando
+    vence. El UPDATE repite la condición, así que dos workers nunca se llevan
+    la misma fila aunque la base ignore SKIP LOCKED (SQLite).
+    """
+    now = datetime.utcnow()
+    lease = now + timedelta(seconds=lease_seconds)
+    due = db.and_(OutboxEvent.status.in_(('pending', 'processing')), OutboxEvent.available_at <= now)
+    ids = db.session.scalars(
+        db.select(OutboxEvent.id).where(due).order_by(OutboxEvent.available_at, OutboxEvent.id)
+        .limit(batch_size).with_for_update(skip_locked=True)
+    ).all()
+    claimed = []
+    if ids:
+        db.session.execute(
+            update(OutboxEvent).where(OutboxEvent.id.in_(ids), due).values(status='processing', available_at=lease),
+            execution_options={'synchronize_session': False}
+        )
+        events = OutboxEvent.query.filter(
+            OutboxEvent.id.in_(ids), OutboxEvent.status == 'processing', OutboxEvent.available_at == lease
+        ).order_by(OutboxEvent.id).all()
+        claimed = [(event.id, event.attempts, lease, event.to_dict()) for event in events]
+    db.session.commit()
+    return claimed
+
+
+def drain_outbox(handlers, batch_size=100, max_attempts=8, lease_seconds=600):
+    """Entrega un lote de eventos pendientes y devuelve (entregados, fallidos).
+
+    Los handlers corren fuera de toda transacción: un webhook lento no deja
+    filas bloqueadas ni una conexión tomada. El resultado se guarda después en
+    otra transacción corta, sólo para los eventos cuyo lease sigue siendo de
+    este worker. Un evento se reintenta con espera exponencial hasta
+    `max_attempts` veces; como un reintento vuelve a pasar por todos los
+    handlers (y un lease vencido también), estos deben ser idempotentes
+    respecto de `idempotency_key`.
+    """
+    results = []
+    for event_id, attempts, lease, data in _claim(batch_size, lease_seconds):
+        try:
+            for handler in handlers:
+                handler(data)
+        except Exception as e:
+            attempts += 1
+            error = f'{type(e).__name__}: {e}'[:1000]
+            if attempts >= max_attempts:
+                values = {'status': 'failed', 'attempts': attempts, 'last_error': error}
+                logger.error('outbox event %s failed permanently: %s', event_id, error)
+            else:
+                values = {'status': 'pending', 'attempts': attempts, 'last_error': error,
+                          'available_at': datetime.utcnow() + _backoff(attempts)}
+        else:
+            values = {'status': 'delivered', 'delivered_at': datetime.utcnow()}
+        results.append((event_id, lease, values))
+
+    delivered = failed = 0
+    for event_id, lease, values in results:
+        db.session.execute(
+            update(OutboxEvent).where(OutboxEvent.id == event_id, OutboxEvent.status == 'processing',
+                                      OutboxEvent.available_at == lease).values(**values),
+            execution_options={'synchronize_session': False}
+        )
+        if values['status'] == 'delivered':
+            delivered += 1
+        else:
+            failed += 1
+    db.session.commit()
+    return delivered, failed
+
+
+def purge_delivered(retention_days):
+    """Borra los eventos entregados hace más de `retention_days` días"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = OutboxEvent.query.filter(
+        OutboxEvent.status == 'delivered',
+        OutboxEvent.delivered_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def run_worker(batch_size, interval, once=False):
+    """Drena el outbox en bucle; duerme `interval` segundos cuando no hay trabajo"""
+    config = current_app.config
+    handlers = [resolve_handler(name) for name in config['OUTBOX_HANDLERS']]
+    last_purge = 0.0
+    while True:
+        delivered, failed = drain_outbox(handlers, batch_size, config['OUTBOX_MAX_ATTEMPTS'],
+                                         config['OUTBOX_LEASE_SECONDS'])
+        if delivered or failed:
+            logger.info('outbox: %s entregados, %s con error', delivered, failed)
+        if once:
+            return
+        if delivered + failed < batch_size:
+            if time.monotonic() - last_purge > PURGE_INTERVAL_SECONDS:
+                purge_delivered(config['OUTBOX_RETENTION_DAYS'])
+                last_purge = time.monotonic()
+            time.sleep(interval)
+
+
+def init_outbox(app):
+    handlers = os.getenv('OUTBOX_HANDLERS', 'log')
+    app.config.setdefault('OUTBOX_HANDLERS', [h.strip() for h in handlers.split(',') if h.strip()])
+    app.config.setdefault('OUTBOX_WEBHOOK_URL', os.getenv('OUTBOX_WEBHOOK_URL'))
+    app.config.setdefault('OUTBOX_WEBHOOK_TIMEOUT', 5.0)
+    app.config.setdefault('OUTBOX_MAX_ATTEMPTS', int(os.getenv('OUTBOX_MAX_ATTEMPTS', '8')))
+    app.config.setdefault('OUTBOX_RETENTION_DAYS', int(os.getenv('OUTBOX_RETENTION_DAYS', '7')))
+    app.config.setdefault('OUTBOX_LEASE_SECONDS', int(os.getenv('OUTBOX_LEASE_SECONDS', '600')))
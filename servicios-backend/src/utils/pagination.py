@@ -0,0 +1,65 @@
+import base64
+import json
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    """Codifica los valores de ordenamiento de la última fila en un cursor opaco"""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decodifica un cursor; lanza ValueError si no es válido"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def parse_limit(value):
+    """Valida el parámetro limit y lo acota a MAX_PAGE_SIZE"""
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid limit')
+    if limit < 1:
+        raise ValueError('Invalid limit')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def keyset_page(query, order, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Devuelve una página de resultados usando paginación por clave (keyset).
+
+    `order` es una lista de tuplas (columna, descendente) cuya última columna
+    debe ser única (normalmente la clave primaria) para que el orden sea estable.
+    Devuelve (filas, siguiente_cursor); el cursor es None en la última página.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(order))
+        clauses = []
+        for i, (column, descending) in enumerate(order):
+            prefix = [col == value for (col, _), value in zip(order[:i], values[:i])]
+            step = column < values[i] if descending else column > values[i]
+            clauses.append(and_(*prefix, step))
+        query = query.filter(or_(*clauses))
+
+    query = query.order_by(*[col.desc() if descending else col.asc() for col, descending in order])
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, col.key) for col, _ in order])
+    return rows, next_cursor
@@ -0,0 +1,106 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import current_app, jsonify
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingOverloaded(Exception):
+    """No hay lugar en la cola de hashing: se rechaza en vez de bloquear al worker"""
+
+
+class PasswordHasher:
+    """Calcula hashes de contraseña en un pool de procesos acotado.
+
+    Como mucho `queue_limit` operaciones pueden estar en curso o esperando;
+    las siguientes fallan de inmediato con HashingOverloaded. Con
+    `workers=0` el hash se calcula en el propio proceso (útil en tests).
+    """
+
+    def __init__(self, method, workers=2, queue_limit=8, timeout=5.0):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        self._prefix = None
+
+    def _executor(self):
+        # El pool se crea después del fork de gunicorn, uno por worker. Sus procesos
+        # no se crean con fork: el worker ya tiene otros hilos y el hijo podría
+        # heredar un lock tomado por alguno de ellos y quedar bloqueado
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(start_method))
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            if in_greenlet():
+                # Modo ASGI: el event loop sigue atendiendo otros requests mientras tanto
+                return await_only(asyncio.wait_for(asyncio.wrap_future(future), self.timeout))
+            return future.result(timeout=self.timeout)
+        except (FutureTimeoutError, asyncio.TimeoutError):
+            future.cancel()
+            raise HashingOverloaded()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def _method_prefix(self):
+        # "scrypt" o "pbkdf2" sin parámetros se guardan con los costos por defecto
+        # ("scrypt:32768:8:1"): el prefijo real sale de hashear una vez algo cualquiera
+        if self._prefix is None:
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, password_hash):
+        """True si el hash se calculó con otro algoritmo o costo que el configurado"""
+        return not password_hash or password_hash.split('$', 1)[0] != self._method_prefix()
+
+
+def get_hasher():
+    return current_app.extensions['password_hasher']
+
+
+def init_passwords(app):
+    app.config.setdefault('PASSWORD_HASH_METHOD', os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'))
+    app.config.setdefault('PASSWORD_HASH_WORKERS', int(os.getenv('PASSWORD_HASH_WORKERS', '2')))
+    app.config.setdefault('PASSWORD_HASH_QUEUE_LIMIT', int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', '8')))
+    app.config.setdefault('PASSWORD_HASH_TIMEOUT', 5.0)
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_QUEUE_LIMIT'],
+        app.config['PASSWORD_HASH_TIMEOUT'],
+    )
+
+    @app.errorhandler(HashingOverloaded)
+    def handle_hashing_overloaded(error):
+        response = jsonify({'error': 'Too many login attempts in progress, retry shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
@@ -0,0 +1,50 @@
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def query_budget(max_statements):
+    """Declara cuántas sentencias SQL puede emitir una vista como máximo.
+
+    El límite sólo se verifica en modo test (TESTING) o con
+    ENFORCE_QUERY_BUDGETS activado; en producción es un simple marcador.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+        wrapper.query_budget = max_statements
+        return wrapper
+    return decorator
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_statements = g.get('sql_statements', 0) + 1
+
+
+def init_query_budget(app):
+    """Cuenta las sentencias SQL de cada request y verifica los presupuestos"""
+    if not event.contains(Engine, 'before_cursor_execute', _count_statement):
+        event.listen(Engine, 'before_cursor_execute', _count_statement)
+
+    @app.before_request
+    def reset_statement_count():
+        # g vive en el contexto de la app, que puede abarcar varios requests
+        # (CLI, tests con app_context()): el conteo arranca de cero en cada uno
+        g.sql_statements = 0
+
+    @app.after_request
+    def check_query_budget(response):
+        if not (current_app.testing or current_app.config.get('ENFORCE_QUERY_BUDGETS')):
+            return response
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, 'query_budget', None)
+        issued = g.get('sql_statements', 0)
+        if budget is not None and issued > budget:
+            raise AssertionError(
+                f'{request.endpoint} issued {issued} SQL statements (budget {budget})'
+            )
+        return response
@@ -0,0 +1,77 @@
+from sqlalchemy import event, text
+
+from src.utils.changes import start_cursor
+
+# Rutas con filtros por clave: ninguna de sus consultas debería recorrer una tabla entera.
+# {changes_cursor} se reemplaza por un cursor nuevo (los de /api/changes vencen)
+CHECKED_URLS = (
+    '/api/professionals?category=electricista',
+    '/api/professionals?category=electricista&sort=rating&min_rating=4',
+    '/api/professionals?specialty=reparaciones',
+    '/api/professionals/1',
+    '/api/professionals/1/reviews',
+    '/api/professionals/1/availability?from=2030-01-01&to=2030-01-07',
+    '/api/professionals/nearby?lat=-31.6333&lon=-60.7&radius=5',
+    '/api/professionals/search?q=reparaciones',
+    '/api/categories/electricista/top?limit=10',
+    '/api/reviews?professional_id=1',
+    '/api/service-requests?professional_id=1',
+    '/api/service-requests?professional_id=1&status=pending',
+    '/api/service-requests/batch?ids=1,2',
+    '/api/professionals/batch?ids=1,2,3',
+    '/api/changes',
+    '/api/changes?since={changes_cursor}',
+    '/api/changes?since={changes_cursor}&types=reviews',
+)
+
+
+def _is_full_scan(detail):
+    """SQLite informa "SCAN" cuando recorre una tabla o un índice completos.
+
+    Las búsquedas por clave aparecen como "SEARCH"; la tabla FTS5 siempre
+    figura como "SCAN ... VIRTUAL TABLE INDEX" y no cuenta.
+    """
+    return detail.startswith('SCAN ') and 'VIRTUAL TABLE' not in detail
+
+
+def find_full_scans(app, db, urls=CHECKED_URLS):
+    """Ejecuta las rutas, captura sus SELECT y devuelve los planes con escaneo completo.
+
+    Sólo aplica a SQLite (EXPLAIN QUERY PLAN). Devuelve (url, sentencia, detalle);
+    una ruta que no responde 2xx también es un problema, con sentencia None,
+    porque sus planes no dicen nada de la consulta que se quería revisar.
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            statements.append((statement, parameters))
+
+    problems = []
+    cache = app.extensions.pop('response_cache', None)
+    try:
+        with app.app_context():
+            engine = db.engine
+        client = app.test_client()
+        changes_cursor = start_cursor()
+        for url in urls:
+            url = url.format(changes_cursor=changes_cursor)
+            statements.clear()
+            event.listen(engine, 'before_cursor_execute', capture)
+            try:
+                response = client.get(url)
+            finally:
+                event.remove(engine, 'before_cursor_execute', capture)
+            if not 200 <= response.status_code < 300:
+                problems.append((url, None, f'HTTP {response.status_code}'))
+                continue
+            with engine.connect() as connection:
+                for statement, parameters in list(statements):
+                    plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+                    for row in plan:
+                        if _is_full_scan(row[-1]):
+                            problems.append((url, statement, row[-1]))
+    finally:
+        if cache is not None:
+            app.extensions['response_cache'] = cache
+    return problems
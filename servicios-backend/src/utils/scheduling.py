@@ -0,0 +1,52 @@
+from datetime import date, datetime, time, timedelta
+
+# Jornada laboral en la que se ofrecen turnos
+WORKDAY_START = time(8, 0)
+WORKDAY_END = time(20, 0)
+# Rango máximo que se puede consultar de una vez
+MAX_RANGE_DAYS = 31
+
+
+def parse_date_range(date_from, date_to):
+    """Convierte from/to (YYYY-MM-DD, ambos inclusive) en un rango de fechas.
+
+    Sin parámetros devuelve los próximos 7 días. Lanza ValueError si el rango
+    es inválido o supera MAX_RANGE_DAYS.
+    """
+    start = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else date.today()
+    end = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else start + timedelta(days=6)
+    if end < start:
+        raise ValueError('to must not be before from')
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f'Range must not exceed {MAX_RANGE_DAYS} days')
+    return start, end
+
+
+def free_slots(busy, start, end, min_minutes):
+    """Intervalos libres dentro de la jornada de cada día entre start y end.
+
+    busy es una lista de intervalos (inicio, fin) ordenada por inicio; se
+    recorre una sola vez junto con los días. Sólo se devuelven huecos de al
+    menos min_minutes.
+    """
+    minimum = timedelta(minutes=min_minutes)
+    slots = []
+    i = 0
+    day = start
+    while day <= end:
+        cursor = datetime.combine(day, WORKDAY_START)
+        closing = datetime.combine(day, WORKDAY_END)
+        # Saltar los turnos que terminan antes de la jornada
+        while i < len(busy) and busy[i][1] <= cursor:
+            i += 1
+        j = i
+        while j < len(busy) and busy[j][0] < closing:
+            busy_start, busy_end = busy[j]
+            if busy_start - cursor >= minimum:
+                slots.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            j += 1
+        if closing - cursor >= minimum:
+            slots.append((cursor, closing))
+        day += timedelta(days=1)
+    return slots
@@ -0,0 +1,102 @@
+import re
+import unicodedata
+
+from sqlalchemy import text
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Índice FTS5 de contenido externo sobre professional.search_text, mantenido por triggers
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS professional_fts USING fts5(
+        search_text, content='professional', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS professional_fts_ai AFTER INSERT ON professional BEGIN
+        INSERT INTO professional_fts(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS professional_fts_ad AFTER DELETE ON professional BEGIN
+        INSERT INTO professional_fts(professional_fts, rowid, search_text)
+        VALUES ('delete', old.id, old.search_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS professional_fts_au AFTER UPDATE OF search_text ON professional BEGIN
+        INSERT INTO professional_fts(professional_fts, rowid, search_text)
+        VALUES ('delete', old.id, old.search_text);
+        INSERT INTO professional_fts(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+]
+
+POSTGRES_VECTOR = "to_tsvector('simple', coalesce(search_text, ''))"
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_professional_search_text ON professional USING gin ({POSTGRES_VECTOR})",
+]
+
+
+def normalize_text(value):
+    """Pasa a minúsculas y quita los acentos ("Plomería" -> "plomeria")"""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(value):
+    return _TOKEN_RE.findall(normalize_text(value))
+
+
+def build_search_text(*parts):
+    """Documento normalizado que se indexa para la búsqueda"""
+    return ' '.join(token for part in parts for token in tokenize(part))
+
+
+def install_search_index(connection):
+    """Crea el índice de texto completo del motor en uso si no existe"""
+    dialect = connection.dialect.name
+    statements = SQLITE_DDL if dialect == 'sqlite' else POSTGRES_DDL if dialect == 'postgresql' else []
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def rebuild_search_index(connection):
+    """Regenera el índice a partir de professional.search_text"""
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text("INSERT INTO professional_fts(professional_fts) VALUES ('rebuild')"))
+    elif connection.dialect.name == 'postgresql':
+        connection.execute(text('REINDEX INDEX ix_professional_search_text'))
+
+
+def search_professional_ids(session, query, category=None, limit=20):
+    """Devuelve los ids de profesionales que coinciden con `query`, por relevancia.
+
+    Cada palabra se busca como prefijo y todas deben aparecer.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    params = {'limit': limit, 'category': category}
+    dialect = session.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        params['q'] = ' '.join(f'"{token}"*' for token in tokens)
+        sql = """SELECT p.id FROM professional_fts
+                 JOIN professional p ON p.id = professional_fts.rowid
+                 WHERE professional_fts MATCH :q
+                   AND (:category IS NULL OR p.category = :category)
+                 ORDER BY bm25(professional_fts), p.id
+                 LIMIT :limit"""
+    elif dialect == 'postgresql':
+        params['q'] = ' & '.join(f'{token}:*' for token in tokens)
+        sql = f"""SELECT id FROM professional
+                  WHERE {POSTGRES_VECTOR} @@ to_tsquery('simple', :q)
+                    AND (CAST(:category AS VARCHAR) IS NULL OR category = :category)
+                  ORDER BY ts_rank({POSTGRES_VECTOR}, to_tsquery('simple', :q)) DESC, id
+                  LIMIT :limit"""
+    else:
+        conditions = []
+        for i, token in enumerate(tokens):
+            params[f't{i}'] = f'%{token}%'
+            conditions.append(f'search_text LIKE :t{i}')
+        sql = f"""SELECT id FROM professional
+                  WHERE {' AND '.join(conditions)}
+                    AND (:category IS NULL OR category = :category)
+                  ORDER BY id LIMIT :limit"""
+
+    return [row[0] for row in session.execute(text(sql), params)]
@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, current_app, request, send_file
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él sólo se generan variantes .gz
+    brotli = None
+
+# Vite deja el bundle en assets/ con nombres como "index-Gjfgz7S9.js": el
+# contenido nunca cambia bajo el mismo nombre, así que se cachean para siempre
+HASHED_DIR = 'assets/'
+HASHED_NAME = re.compile(r'-[A-Za-z0-9_-]{8}\.[a-z0-9]+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# (Content-Encoding, extensión) en orden de preferencia
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml',
+                      'application/xml', 'application/manifest+json')
+MIN_COMPRESS_SIZE = 1024
+
+
+class Asset:
+    """Archivo estático con sus metadatos y variantes precomprimidas ya resueltos"""
+
+    def __init__(self, path, relpath):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(relpath)[0] or 'application/octet-stream'
+        stat = os.stat(path)
+        self.last_modified = stat.st_mtime
+        with open(path, 'rb') as f:
+            self.etag = hashlib.md5(f.read()).hexdigest()
+        self.immutable = relpath.startswith(HASHED_DIR) and HASHED_NAME.search(relpath) is not None
+        # Una variante más vieja que el original quedó de un build anterior y se ignora
+        self.variants = {
+            encoding: path + suffix
+            for encoding, suffix in ENCODINGS
+            if os.path.isfile(path + suffix) and os.path.getmtime(path + suffix) >= self.last_modified
+        }
+
+
+class AssetManifest:
+    """Índice en memoria de los archivos de la carpeta static, armado al iniciar.
+
+    Así cada request se resuelve con un lookup en un dict en lugar de consultar
+    el sistema de archivos, y el index.html de la SPA se sirve desde memoria.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.assets = {}
+        self.index = None
+        self.index_variants = {}
+        if not root or not os.path.isdir(root):
+            return
+        for directory, _, files in os.walk(root):
+            for name in files:
+                if name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                    continue
+                path = os.path.join(directory, name)
+                relpath = os.path.relpath(path, root).replace(os.sep, '/')
+                self.assets[relpath] = Asset(path, relpath)
+        index = self.assets.get('index.html')
+        if index is not None:
+            with open(index.path, 'rb') as f:
+                self.index = f.read()
+            for encoding, variant in index.variants.items():
+                with open(variant, 'rb') as f:
+                    self.index_variants[encoding] = f.read()
+
+
+def _negotiate(variants):
+    """Mejor codificación disponible que el cliente acepta, o None para enviar sin comprimir"""
+    accepted = request.accept_encodings
+    for encoding, _ in ENCODINGS:
+        if encoding in variants and accepted.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def _set_encoding_headers(response, asset, encoding):
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f'{asset.etag}-{encoding}' if encoding else asset.etag)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+
+
+def _send_asset(asset):
+    encoding = _negotiate(asset.variants)
+    response = send_file(
+        asset.variants[encoding] if encoding else asset.path,
+        mimetype=asset.mimetype,
+        etag=False,
+        last_modified=asset.last_modified,
+        conditional=False,
+        # Sin max_age, send_file marca la respuesta como no-cache (revalidar siempre)
+        max_age=IMMUTABLE_MAX_AGE if asset.immutable else None,
+    )
+    _set_encoding_headers(response, asset, encoding)
+    if asset.immutable:
+        response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+
+def _send_index(manifest):
+    asset = manifest.assets['index.html']
+    encoding = _negotiate(manifest.index_variants)
+    body = manifest.index_variants[encoding] if encoding else manifest.index
+    response = Response(body, mimetype='text/html')
+    _set_encoding_headers(response, asset, encoding)
+    response.last_modified = asset.last_modified
+    # El index.html referencia los nombres con hash: siempre se revalida
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def get_manifest():
+    # En modo debug se vuelve a leer la carpeta para ver los cambios de un build nuevo
+    if current_app.debug:
+        return AssetManifest(current_app.static_folder)
+    return current_app.extensions['asset_manifest']
+
+
+def serve_frontend(path):
+    """Sirve un archivo del bundle o, para cualquier otra ruta, el index.html de la SPA"""
+    manifest = get_manifest()
+    if not manifest.root:
+        return "Static folder not configured", 404
+    asset = manifest.assets.get(path)
+    if asset is not None and path != 'index.html':
+        return _send_asset(asset)
+    if manifest.index is None:
+        return "index.html not found", 404
+    return _send_index(manifest)
+
+
+def precompress_static(root, use_brotli=True):
+    """Escribe variantes .gz (y .br si está instalado brotli) de los archivos comprimibles.
+
+    Devuelve las rutas generadas. Las variantes que ya están al día se saltean.
+    """
+    written = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                continue
+            path = os.path.join(directory, name)
+            mimetype = mimetypes.guess_type(name)[0] or ''
+            if not mimetype.startswith(COMPRESSIBLE_TYPES) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            compressors = [('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+            if use_brotli and brotli is not None:
+                compressors.append(('.br', lambda d: brotli.compress(d, quality=11)))
+            for suffix, compress in compressors:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                with open(target, 'wb') as f:
+                    f.write(compress(data))
+                written.append(target)
+    return written
+
+
+def init_static_assets(app):
+    app.extensions['asset_manifest'] = AssetManifest(app.static_folder)
@@ -0,0 +1,31 @@
+from flask import current_app, jsonify, request, stream_with_context
+
+STREAM_BATCH_SIZE = 500
+
+
+def wants_stream():
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def stream_json_array(query, serialize, batch_size=STREAM_BATCH_SIZE):
+    """Respuesta que escribe un array JSON a medida que recorre la consulta.
+
+    La consulta se lee con yield_per, así que la memoria no crece con la
+    cantidad de filas y el primer byte sale con el primer lote.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '['
+        for i, item in enumerate(query.yield_per(batch_size)):
+            yield (',' if i else '') + dumps(serialize(item))
+        yield ']'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+def json_list_response(query, serialize):
+    """Lista JSON materializada o, con ?stream=1, en streaming"""
+    if wants_stream():
+        return stream_json_array(query, serialize)
+    return jsonify([serialize(item) for item in query.all()])
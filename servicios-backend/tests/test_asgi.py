@@ -0,0 +1,92 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from sqlalchemy.util.concurrency import in_greenlet
+
+from src.main import create_app, create_asgi_app
+from src.models.user import db
+from src.sample_data import init_sample_data
+from src.utils import migrations
+from src.utils.asgi import ASGIBridge
+
+
+@pytest.fixture
+def bridge(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/app.db', 'RESPONSE_CACHE_URL': 'none',
+                      'EVENT_BROKER_URL': 'memory://'})
+    with app.app_context():
+        migrations.upgrade(db.engine)
+        init_sample_data()
+    return ASGIBridge(app)
+
+
+async def request(bridge, path, query_string=b''):
+    """Un GET por el bridge; devuelve (status, cuerpo)"""
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query_string,
+             'headers': [], 'http_version': '1.1'}
+    received = asyncio.Queue()
+    await received.put({'type': 'http.request', 'body': b'', 'more_body': False})
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await bridge(scope, received.get, send)
+    assert messages[-1] == {'type': 'http.response.body', 'body': b''}
+    return messages[0]['status'], b''.join(m.get('body', b'') for m in messages[1:])
+
+
+def call(bridge, path, query_string=b''):
+    return asyncio.run(request(bridge, path, query_string))
+
+
+def test_streamed_json_list(bridge):
+    status, body = call(bridge, '/api/service-requests', b'stream=1')
+    assert status == 200
+    assert isinstance(json.loads(body), list)
+
+
+def test_ndjson_export(bridge):
+    status, body = call(bridge, '/api/bulk/professionals/export')
+    assert status == 200
+    lines = body.decode().splitlines()
+    assert lines and all(json.loads(line)['id'] for line in lines)
+
+
+async def lifespan(bridge):
+    received = asyncio.Queue()
+    await received.put({'type': 'lifespan.startup'})
+    await received.put({'type': 'lifespan.shutdown'})
+    messages = []
+
+    async def send(message):
+        messages.append(message['type'])
+
+    await bridge({'type': 'lifespan'}, received.get, send)
+    return messages
+
+
+def test_shutdown_hook_runs_in_greenlet_before_completion():
+    calls = []
+    bridge = ASGIBridge(None, on_shutdown=lambda: calls.append(in_greenlet()))
+    assert asyncio.run(lifespan(bridge)) == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert calls == [True]
+
+
+def test_async_mode_exits_after_shutdown(tmp_path):
+    pytest.importorskip('aiosqlite')
+    with create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/app.db'}).app_context():
+        migrations.upgrade(db.engine)
+    bridge = create_asgi_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/app.db',
+                              'RESPONSE_CACHE_URL': 'none', 'EVENT_BROKER_URL': 'memory://'})
+
+    async def serve():
+        status, _ = await request(bridge, '/api/professionals')
+        assert status == 200
+        await lifespan(bridge)
+
+    asyncio.run(serve())
+    # Las conexiones de aiosqlite son hilos no daemon: si quedara alguno el proceso no terminaría
+    assert not [t for t in threading.enumerate() if t is not threading.main_thread() and not t.daemon]